@@ -5,20 +5,51 @@ import base64
 import csv
 import shutil
 import json
+import gzip
 import shlex
+import hashlib
+import heapq
+import struct
+from array import array
+import fnmatch
+import sqlite3
+import uuid
+import time
+import random
+import tempfile
+import argparse
+import platform
+import threading
+import re
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from enum import Enum, auto
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QFileDialog, QTextEdit, QLabel, QListWidget, QListWidgetItem,
     QStyleFactory, QProgressBar, QSpinBox, QMessageBox, QDialog, QComboBox, QLineEdit,
-    QCheckBox
+    QCheckBox, QFormLayout, QDialogButtonBox, QInputDialog, QMenu
 )
-from PyQt6.QtCore import QThread, QObject, pyqtSignal, Qt, QByteArray, QBuffer, QIODevice, QRunnable, QThreadPool, QTimer
+from PyQt6.QtCore import QThread, QObject, pyqtSignal, Qt, QByteArray, QBuffer, QIODevice, QRunnable, QThreadPool, QTimer, QFileSystemWatcher, QSettings
 from PyQt6.QtGui import QMovie, QAction, QIcon, QGuiApplication
 
 # --- Constants & Enums ---
 LOADING_GIF_B64 = b'R0lGODlhEAAQAPIAAP///wAAAMLCwkJCQgAAAGJiYoKCgpKSkiH/C05FVFNDQVBFMi4wAwEAAAAh/hpDcmVhdGVkIHdpdGggYWpheGxvYWQuaW5mbwAh+QQJCgAAACwAAAAAEAAQAAADMwi63P4wyklrE2MIOggZnAdOmGYJRbExwroUmcG2LmDEwnHQLVsYOd2mBzkYDAdKa+dIAAAh+QQJCgAAACwAAAAAEAAQAAADNAi63P5OjCEgG4QMu7DmikRxQlFUYDEZIGBMRVsaqHwctXXf7WEYB4Ag1axihOCsitegAAAIfkECQoAAAAsAAAAABAAEAAAAzYIujIjK8pByJDMlFYvBoVjHA70GU7xSUJhmKtwHPAKzLO9HMaoKwJZ7Rf8AYPDDzKpZBqfvwQAIfkECQoAAAAsAAAAABAAEAAAAzMIumIlK8oyhpHsnFZvxvoCTORHolIKYsSoLwAI8A9G5sqDsdwaAyTTu7efvHYKxynWyAAAIfkECQoAAAAsAAAAABAAEAAAAzMIuiJijK6pByJDMlFYvBoVjHA70GU7xSUJhmKtwHPAKzLO9HMaoKwJZ7Rf8AYPDDzKpZBqfvwQAIfkECQoAAAAsAAAAABAAEAAAAzYIujIjK8pByJDMlFYvBoVjHA70GU7xSUJhmKtwHPAKzLO9HMaoKwJZ7Rf8AYPDDzKpZBqfvwQAIfkECQoAAAAsAAAAABAAEAAAAzMIumIlK8oyhpHsnFZvxvoCTORHolIKYsSoLwAI8A9G5sqDsdwaAyTTu7efvHYKxynWyAAAIfkECQoAAAAsAAAAABAAEAAAAzMIuiJijK6pByJDMlFYvBoVjHA70GU7xSUJhmKtwHPAKzLO9HMaoKwJZ7Rf8AYPDDzKpZBqfvwQAIfkECAoAAAAsAAAAABAAEAAAAwYIujIjK8pByJDMlFYvBoVjHA70GU7xSUJhmKtwHPAKzLO9HMaoKwJZ7Rf8AYPDDzKpZBqfvwQAIfkECAoAAAAsAAAAABAAEAAAAwYIujIjK8pByJDMlFYvBoVjHA70GU7xSUJhmKtwHPAKzLO9HMaoKwJZ7Rf8AYPDDzKpZBqfvwQAIfkECAoAAAAsAAAAABAAEAAAAwYIujIjK8pByJDMlFYvBoVjHA70GU7xSUJhmKtwHPAKzLO9HMaoKwJZ7Rf8AYPDDzKpZBqfvwQAOwAAAAAAAAAAAA=='
 MEDIA_EXTENSIONS = {ext.lower() for ext in ['.mkv', '.mp4', '.avi', '.mov', '.wmv', '.flv', '.webm', '.mpg', '.mpeg', '.ts', '.m2ts', '.vob']}
+DEFAULT_MEDIA_EXTENSIONS = frozenset(MEDIA_EXTENSIONS)
+NO_WINDOW_FLAGS = subprocess.CREATE_NO_WINDOW if sys.platform == 'win32' else 0
+try: import resource
+except ImportError: resource = None  # Not available on Windows
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError: pyarrow = None  # Parquet/Arrow export is optional
+try: import tomllib
+except ImportError: tomllib = None  # Python < 3.11: TOML policies unavailable
+try: import yaml
+except ImportError: yaml = None  # YAML policies are optional
 
 class JobStatus(Enum):
     """Status of a file processing job."""
@@ -34,7 +65,42 @@ class AppState(Enum):
     RUNNING = auto()
     PAUSED = auto()
     CANCELLING = auto()
-    MOVING = auto()
+    REPAIRING = auto()
+
+class CheckOptions:
+    """How a single file should be checked."""
+    def __init__(self, fast_check=False, fast_duration=60, incremental=False, time_range=None, profile='full', demux=False, timeout=None,
+                 analyze=False, checksums=None):
+        self.fast_check = fast_check
+        self.fast_duration = fast_duration
+        self.incremental = incremental  # recheck only what changed since the last verified fingerprint
+        self.time_range = time_range    # (start, end or None) seconds to decode, set per job by incremental rechecks
+        self.profile = profile          # key of CHECK_PROFILES
+        self.demux = demux              # read every packet without decoding (-c copy)
+        self.timeout = timeout          # seconds before the check is aborted and reported as failed
+        self.analyze = analyze          # also check stream timestamps and A/V sync in the same pass
+        self.checksums = checksums      # None, 'record' or 'verify' per-frame decoded checksums
+        if checksums:
+            # Checksums cover every decoded frame, so they imply a full decode at full resolution.
+            self.fast_check = self.demux = False; self.time_range = None; self.profile = 'full'
+
+    @property
+    def mode_name(self):
+        if self.checksums: return f"checksums:{self.checksums}"
+        if self.demux: return "demux"
+        mode = "incremental" if self.time_range else "tail" if self.fast_check else "full"
+        return mode if self.profile == 'full' else f"{mode}:{self.profile}"
+
+    @property
+    def decodes_whole_file(self): return not self.fast_check and not self.demux
+
+    def replace(self, **changes):
+        values = dict(vars(self)); values.update(changes)
+        return CheckOptions(**values)
+
+    def for_range(self, start, end=None): return self.replace(fast_check=False, time_range=(start, end))
+
+    def with_profile(self, profile): return self.replace(profile=profile)
 
 class FileJob:
     def __init__(self, path, list_widget_item):
@@ -42,70 +108,1227 @@ class FileJob:
         self.list_widget_item = list_widget_item
         self.status = JobStatus.QUEUED
         self.details = "Queued for processing..."
+        self.checked_at = None
+        self.timing = JobTiming()
+        self.result = None
+        self.profile = None  # per-job CHECK_PROFILES override of the global profile
+        self.rule = None     # PolicyRule matched when the job was queued
+        self.log = None        # raw ffmpeg output, kept in memory only when it is not in the result index
+        self.result_id = None  # result index row holding the raw ffmpeg output
+
+class JobTiming:
+    """Lifecycle timestamps (time.monotonic) and child resource usage of one check."""
+    def __init__(self):
+        self.queued = time.monotonic()
+        self.started = self.first_byte = self.finished = self.handled = None
+        self.file_size = 0
+        self.user_cpu = self.system_cpu = self.max_rss_kb = None
+        self.decoded_seconds = None     # last output timestamp reported by ffmpeg's -progress
+        self.first_error_offset = None  # output timestamp at which the first error line appeared
+
+    def phases(self):
+        """Returns the elapsed seconds of each lifecycle phase that has completed."""
+        spans = {'queue_wait': (self.queued, self.started), 'startup': (self.started, self.first_byte),
+                 'run': (self.started, self.finished), 'ui_latency': (self.finished, self.handled)}
+        return {name: end - start for name, (start, end) in spans.items() if start is not None and end is not None}
+
+# --- FFmpeg Discovery ---
+def app_data_dir():
+    """Per-user directory for caches and result data."""
+    if sys.platform == 'win32': base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    elif sys.platform == 'darwin': base = os.path.expanduser('~/Library/Application Support')
+    else: base = os.environ.get('XDG_DATA_HOME') or os.path.expanduser('~/.local/share')
+    path = os.path.join(base, 'AVIC'); os.makedirs(path, exist_ok=True)
+    return path
+
+class FFmpegInfo:
+    """Location and capabilities of the ffmpeg/ffprobe binaries in use."""
+    def __init__(self, ffmpeg='ffmpeg', ffprobe='ffprobe', version=None, decoders=(), options=(), error=None):
+        self.ffmpeg = ffmpeg
+        self.ffprobe = ffprobe
+        self.version = version
+        self.decoders = set(decoders)
+        self.options = set(options)
+        self.error = error
+
+    @property
+    def available(self): return self.version is not None
+
+    def supports(self, option):
+        # Before probing has finished, assume a modern build.
+        return not self.options or option in self.options
+
+    def has_decoder(self, name): return not self.decoders or name in self.decoders
+
+    def to_dict(self):
+        return {'ffmpeg': self.ffmpeg, 'ffprobe': self.ffprobe, 'version': self.version,
+                'decoders': sorted(self.decoders), 'options': sorted(self.options)}
+
+FFMPEG = FFmpegInfo()
+
+def set_ffmpeg_info(info):
+    global FFMPEG
+    FFMPEG = info
+
+def _bundled_dirs():
+    dirs = []
+    if getattr(sys, 'frozen', False):
+        dirs.append(getattr(sys, '_MEIPASS', os.path.dirname(sys.executable))); dirs.append(os.path.dirname(sys.executable))
+    dirs.append(os.path.dirname(os.path.abspath(__file__)))
+    return dirs
+
+def locate_binary(name, configured=None):
+    """Finds a binary in the configured location, next to the application, then on PATH."""
+    exe = name + '.exe' if sys.platform == 'win32' else name
+    candidates = []
+    if configured:
+        if os.path.isdir(configured): candidates.append(os.path.join(configured, exe))
+        elif name == 'ffmpeg': candidates.append(configured)
+        else: candidates.append(os.path.join(os.path.dirname(configured), exe))
+    candidates.extend(os.path.join(d, exe) for d in _bundled_dirs())
+    for candidate in candidates:
+        if os.path.isfile(candidate) and os.access(candidate, os.X_OK): return os.path.abspath(candidate)
+    return shutil.which(name)
+
+def probe_ffmpeg(ffmpeg_path):
+    """Runs ffmpeg once to read its version, decoders and supported options."""
+    def capture(*args):
+        return subprocess.run([ffmpeg_path, '-hide_banner', *args], capture_output=True, text=True, errors='replace',
+                              check=False, creationflags=NO_WINDOW_FLAGS).stdout
+    version_lines = subprocess.run([ffmpeg_path, '-version'], capture_output=True, text=True, errors='replace',
+                                   check=True, creationflags=NO_WINDOW_FLAGS).stdout.splitlines()
+    decoders = re.findall(r'^ [VASDT.][F.][S.][X.][B.][D.] (\S+)', capture('-decoders'), re.MULTILINE)
+    options = re.findall(r'^\s*-([\w:]+)', capture('-h', 'full'), re.MULTILINE)
+    return version_lines[0] if version_lines else 'unknown', decoders, options
+
+def resolve_ffmpeg(configured=None):
+    """Locates ffmpeg/ffprobe and returns their FFmpegInfo, reusing a cached probe while the binary is unchanged."""
+    ffmpeg_path = locate_binary('ffmpeg', configured)
+    if not ffmpeg_path: return FFmpegInfo(error="FFmpeg could not be found.")
+    ffprobe_path = locate_binary('ffprobe', configured or os.path.dirname(ffmpeg_path))
+    st = os.stat(ffmpeg_path); key = f"{ffmpeg_path}|{st.st_mtime_ns}|{st.st_size}"
+    cache_path = os.path.join(app_data_dir(), 'ffmpeg_cache.json')
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f: cache = json.load(f)
+    except (OSError, ValueError): cache = {}
+    if key in cache:
+        entry = cache[key]
+        return FFmpegInfo(ffmpeg_path, ffprobe_path, entry['version'], entry['decoders'], entry['options'])
+    try: version, decoders, options = probe_ffmpeg(ffmpeg_path)
+    except (OSError, subprocess.CalledProcessError) as e: return FFmpegInfo(ffmpeg_path, ffprobe_path, error=f"FFmpeg at {ffmpeg_path} could not be run: {e}")
+    info = FFmpegInfo(ffmpeg_path, ffprobe_path, version, decoders, options)
+    cache = {k: v for k, v in cache.items() if not k.startswith(ffmpeg_path + '|')}
+    cache[key] = {'version': version, 'decoders': sorted(info.decoders), 'options': sorted(info.options)}
+    try:
+        with open(cache_path, 'w', encoding='utf-8') as f: json.dump(cache, f)
+    except OSError: pass
+    return info
+
+class FFmpegProbeSignals(QObject):
+    finished = pyqtSignal(object)
+
+class RunnableFFmpegProbe(QRunnable):
+    def __init__(self, configured=None):
+        super().__init__()
+        self.configured = configured
+        self.signals = FFmpegProbeSignals()
+
+    def run(self):
+        try: info = resolve_ffmpeg(self.configured)
+        except Exception as e: info = FFmpegInfo(error=f"FFmpeg detection failed: {e}")
+        self.signals.finished.emit(info)
+
+# --- Check Engine ---
+CHECK_PROFILES = {
+    # key: (label, skip_frame value, decode at reduced resolution, detection coverage)
+    'full': ("Full Decode", None, False,
+             "Decodes every frame of every stream at full resolution. Finds every error FFmpeg can detect."),
+    'video': ("Video Only", None, False,
+              "Skips audio and subtitle decoding. Audio bitstream errors are missed; video and container errors are still found."),
+    'lowres': ("Reduced Resolution", None, True,
+               "Video only, decoded at 1/4 resolution where the decoder supports it (MPEG-1/2/4, H.263, MJPEG, DV, WMV1/2, JPEG 2000).\n"
+               "The whole bitstream is still parsed, so nearly all video errors are found. Other codecs (H.264, HEVC, AV1) decode at full resolution."),
+    'nonref': ("Reference Frames", 'noref', True,
+               "Video only; non-reference frames (most B-frames) are skipped. Errors confined to skipped frames are missed,\n"
+               "damage in reference frames and container errors are still found."),
+    'keyframes': ("Keyframes Only", 'nokey', True,
+                  "Video only; only keyframes are decoded, but every packet is still demuxed. Finds truncation, container and\n"
+                  "keyframe errors; misses most damage inside GOPs. Cheapest tier, meant for bulk archive sweeps."),
+}
+# Decoders that implement -lowres.
+LOWRES_DECODERS = {'mpeg1video', 'mpeg2video', 'mpeg4', 'h263', 'h263p', 'flv1', 'msmpeg4v1', 'msmpeg4v2', 'msmpeg4v3',
+                   'wmv1', 'wmv2', 'mjpeg', 'dvvideo', 'jpeg2000'}
+
+def profile_options(profile, codec=None):
+    """Returns the (input, output) ffmpeg options that apply a check profile to a file with the given video codec."""
+    _, skip_frame, lowres, _ = CHECK_PROFILES[profile]
+    input_options = []
+    if lowres and codec in LOWRES_DECODERS and FFMPEG.supports('lowres'): input_options += ['-lowres:v', '2']
+    if skip_frame and FFMPEG.supports('skip_frame'): input_options += ['-skip_frame:v', skip_frame]
+    output_options = [] if profile == 'full' else ['-an', '-sn', '-dn']
+    return input_options, output_options
+
+def build_check_command(path, options, codec=None):
+    command = [FFMPEG.ffmpeg, '-nostdin']
+    if options.time_range:
+        start, end = options.time_range
+        command.extend(['-ss', f'{start:.3f}'])
+        if end is not None: command.extend(['-t', f'{end - start:.3f}'])
+    elif options.fast_check:
+        command.extend(['-sseof', f'-{options.fast_duration}'])
+    if options.demux: input_options, output_options = [], ['-map', '0', '-c', 'copy']
+    else: input_options, output_options = profile_options(options.profile, codec)
+    command.extend(['-v', 'level+warning' if options.analyze else 'error', *input_options, '-i', path])
+    if options.checksums:
+        # Decoded frames are hashed instead of discarded; the same listing feeds the timeline analysis.
+        passthrough = ['-fps_mode', 'passthrough'] if FFMPEG.supports('fps_mode') else ['-vsync', 'passthrough']
+        command.extend(['-map', '0:V?', '-map', '0:a?', *passthrough, '-flags', '+bitexact', '-fflags', '+bitexact', '-f', 'framemd5', 'pipe:1'])
+        return command
+    if options.analyze:
+        # A packet timestamp listing of the audio/video streams, fed by the same demuxing pass as the check.
+        command.extend(['-map', '0:V?', '-map', '0:a?', '-c', 'copy', '-f', 'framecrc', 'pipe:1'])
+        if options.demux: return command
+    command.extend([*output_options, '-f', 'null'])
+    if FFMPEG.supports('progress') and not options.analyze: command.extend(['-progress', 'pipe:1', '-nostats'])
+    command.append('-')
+    return command
+
+def run_check(path, options, timing=None, codec=None):
+    """Runs a blocking ffmpeg check of one file and returns (is_success, details).
+
+    `codec` is the file's video codec, if known, for profiles that depend on decoder support.
+    If a JobTiming is given it receives the time of ffmpeg's first progress report and,
+    on POSIX, the child's CPU time and peak RSS as reported by os.wait4.
+    With options.analyze, timestamp and A/V sync problems found in the same pass also fail the check.
+    """
+    timing = timing or JobTiming()
+    analyzer = TimelineAnalyzer() if options.analyze else None
+    checksums = FrameChecksumSession(path, options.checksums) if options.checksums else None
+    try:
+        if timing.started is None: timing.started = time.monotonic()
+        process = subprocess.Popen(
+            build_check_command(path, options, codec), stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, errors='replace',
+            creationflags=NO_WINDOW_FLAGS
+        )
+        stderr_chunks = []
+        def read_stderr():
+            for line in process.stderr:
+                if analyzer:
+                    match = FFMPEG_LOG_LEVEL.search(line)
+                    if match and match.group(1) == 'warning': analyzer.warnings.append(line); continue
+                    if match: line = line[:match.start()] + line[match.end():]
+                if not stderr_chunks: timing.first_error_offset = timing.decoded_seconds or 0.0
+                stderr_chunks.append(line)
+        stderr_reader = threading.Thread(target=read_stderr, daemon=True)
+        stderr_reader.start()
+        timed_out = threading.Event()
+        def kill_on_timeout(): timed_out.set(); process.kill()
+        watchdog = threading.Timer(options.timeout, kill_on_timeout) if options.timeout else None
+        if watchdog: watchdog.daemon = True; watchdog.start()
+        for line in process.stdout:
+            if timing.first_byte is None: timing.first_byte = time.monotonic()
+            if analyzer or checksums:
+                reached = analyzer.feed(line) if analyzer else None
+                if checksums:
+                    reached = checksums.feed(line)
+                    if checksums.mismatch:
+                        # The first differing frame decides the outcome; decoding the rest would only cost time.
+                        timing.first_error_offset = reached; process.kill(); break
+                if reached is not None and reached > (timing.decoded_seconds or 0.0): timing.decoded_seconds = reached
+            elif line.startswith('out_time_us='):
+                try: timing.decoded_seconds = max(0, int(line[12:])) / 1e6
+                except ValueError: pass
+        stderr_reader.join()
+        if hasattr(os, 'wait4'):
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+            timing.user_cpu, timing.system_cpu = usage.ru_utime, usage.ru_stime
+            timing.max_rss_kb = usage.ru_maxrss // 1024 if sys.platform == 'darwin' else usage.ru_maxrss
+        else: process.wait()
+        process.stdout.close(); process.stderr.close()
+        if watchdog: watchdog.cancel()
+        timing.finished = time.monotonic()
+        stderr = ''.join(stderr_chunks)
+        if timed_out.is_set(): return False, f"Check timed out after {options.timeout:g}s.\n{stderr}".strip()
+        if checksums and checksums.mismatch: return False, f"{checksums.mismatch}\n{stderr}".strip()
+        is_success = process.returncode == 0 and not stderr
+        issues = analyzer.issues() if analyzer and process.returncode == 0 else []
+        if checksums: issues += checksums.finish(is_success and not issues)
+        if issues: return False, "\n".join(issues + [stderr.strip()]).strip()
+        if checksums and checksums.note: return is_success, f"{checksums.note}\n{stderr}".strip()
+        return is_success, stderr.strip() or "OK"
+    finally:
+        # Timeouts, early returns and exceptions must not leave a half-written reference behind.
+        if checksums: checksums.abort()
+
+ERROR_CLASSES = [
+    # (class, pattern) — the first matching pattern classifies an ffmpeg error line.
+    ('io', re.compile(r'I/O error|Input/output error|No such file|Permission denied|Connection', re.I)),
+    ('truncated', re.compile(r'truncat|partial file|end of file|moov atom not found|Packet corrupt|incomplete', re.I)),
+    ('container', re.compile(r'\[(?:mov|matroska|mpegts|avi|flv|asf|mpeg|ogg)[,\w]* @|invalid (?:atom|EBML)|exceeds containing master', re.I)),
+    ('checksum', re.compile(r'Checksum mismatch', re.I)),
+    ('sync', re.compile(r'A/V drift', re.I)),
+    ('timestamp', re.compile(r'timestamp|\bdts\b|\bpts\b|Non-monoton', re.I)),
+    ('audio', re.compile(r'\[(?:aist#[^\]]*|(?:aac|mp3\w*|mp2|ac3|eac3|dca|opus|vorbis|flac|pcm_\w+) @[^\]]*)\]', re.I)),
+    ('reference', re.compile(r'reference|no frame|missing picture|co located POCs', re.I)),
+    ('bitstream', re.compile(r'NAL unit|slice|macroblock|\bMB\b|marker bit|bitstream|overread|concealing|corrupt|decoding|decoder|Invalid data found', re.I)),
+]
+
+def classify_errors(details):
+    """Returns (error line count, sorted error classes) for ffmpeg error output."""
+    lines = [line for line in details.splitlines() if line.strip()]; classes = set()
+    for line in lines:
+        classes.add(next((name for name, pattern in ERROR_CLASSES if pattern.search(line)), 'other'))
+    return len(lines), sorted(classes)
+
+class CheckResult:
+    """Typed summary of one finished check, used for exports."""
+    FIELDS = ['path', 'size', 'duration', 'codec', 'status', 'error_count', 'error_classes', 'first_error_time',
+              'check_mode', 'elapsed_seconds', 'throughput_mb_s', 'checked_at']
+
+    def __init__(self, path, status, size=0, duration=None, codec=None, error_count=0, error_classes=(),
+                 first_error_time=None, check_mode='full', elapsed_seconds=None, checked_at=None):
+        self.path = path
+        self.status = status
+        self.size = size
+        self.duration = duration
+        self.codec = codec
+        self.error_count = error_count
+        self.error_classes = list(error_classes)
+        self.first_error_time = first_error_time
+        self.check_mode = check_mode
+        self.elapsed_seconds = elapsed_seconds
+        self.checked_at = checked_at if checked_at is not None else time.time()
+        self.fingerprint = None  # FileFingerprint of a verified file, set when incremental rechecks are enabled
+
+    @property
+    def throughput_mb_s(self):
+        if not self.elapsed_seconds: return None
+        return round(self.size / (1024 * 1024) / self.elapsed_seconds, 3)
+
+    def to_row(self): return {field: getattr(self, field) for field in self.FIELDS}
+
+    @classmethod
+    def from_row(cls, row): return cls(**{k: v for k, v in row.items() if k in cls.FIELDS and k != 'throughput_mb_s'})
+
+def build_check_result(path, is_success, details, options, timing, media_info):
+    video = media_video_stream(media_info)
+    duration = media_duration(media_info)
+    if duration is None and not options.fast_check and not options.time_range: duration = timing.decoded_seconds
+    error_count, error_classes = classify_errors(details) if not is_success else (0, [])
+    first_error_time = timing.first_error_offset
+    if first_error_time is not None and options.fast_check and duration:
+        first_error_time += max(0.0, duration - options.fast_duration)
+    elif first_error_time is not None and options.time_range:
+        first_error_time += options.time_range[0]
+    elapsed = timing.finished - timing.started if timing.finished and timing.started else None
+    return CheckResult(path, 'OK' if is_success else 'FAILED', timing.file_size, duration, video.get('codec_name'),
+                       error_count, error_classes, first_error_time, options.mode_name, elapsed)
+
+def probe_media(path):
+    """Returns ffprobe's format/stream description of a file, or an empty dict if it cannot be read."""
+    if not FFMPEG.ffprobe: return {}
+    try:
+        process = subprocess.run([FFMPEG.ffprobe, '-v', 'error', '-print_format', 'json', '-show_format', '-show_streams', path],
+                                 capture_output=True, text=True, errors='replace', check=False, creationflags=NO_WINDOW_FLAGS)
+        return json.loads(process.stdout) if process.returncode == 0 else {}
+    except (OSError, ValueError): return {}
+
+def media_video_stream(info):
+    return next((s for s in info.get('streams', []) if s.get('codec_type') == 'video'), {})
+
+def media_duration(info):
+    try: return float(info.get('format', {}).get('duration'))
+    except (TypeError, ValueError): return None
+
+# --- Differential Recheck ---
+FINGERPRINT_CHUNK_SIZE = 16 * 1024 * 1024
+INCREMENTAL_MARGIN_SECONDS = 5.0
+# Containers whose sample index covers the whole file: any change may invalidate earlier data, so they are rechecked in full.
+INDEXED_CONTAINERS = {'.mp4', '.m4v', '.mov', '.3gp', '.avi', '.wmv', '.asf'}
+
+class FileFingerprint:
+    """Size, mtime, duration and per-chunk hashes of a file at the time it was last verified."""
+    def __init__(self, size, mtime_ns, hashes, duration=None, chunk_size=FINGERPRINT_CHUNK_SIZE, codec=None):
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.hashes = hashes
+        self.duration = duration
+        self.chunk_size = chunk_size
+        self.codec = codec  # from the file's latest indexed result, so an unchanged recheck keeps it searchable
+
+def fingerprint_file(path, size, chunk_size=FINGERPRINT_CHUNK_SIZE, boundary=None):
+    """Hashes the first `size` bytes of a file in fixed-size chunks.
+
+    Returns (chunk hashes, hash of the bytes from the start of the chunk containing `boundary` up to `boundary`),
+    the latter so a previously partial last chunk can be compared after the file has grown.
+    """
+    hashes = []; boundary_hash = None; offset = 0
+    with open(path, 'rb') as f:
+        while offset < size:
+            data = f.read(min(chunk_size, size - offset))
+            if not data: break
+            if boundary is not None and offset < boundary < offset + len(data):
+                boundary_hash = hashlib.blake2b(data[:boundary - offset], digest_size=16).digest()
+            hashes.append(hashlib.blake2b(data, digest_size=16).digest()); offset += len(data)
+    return hashes, boundary_hash
+
+def plan_incremental_check(path, baseline, stat):
+    """Compares a file with its last verified fingerprint.
+
+    Returns (plan, time range, fingerprint, reason) where plan is 'unchanged', 'range' or 'full'.
+    """
+    if stat.st_size == baseline.size and stat.st_mtime_ns == baseline.mtime_ns:
+        return 'unchanged', None, baseline, "File unchanged since it was last verified."
+    chunk_size = baseline.chunk_size; boundary = baseline.size if baseline.size % chunk_size else None
+    hashes, boundary_hash = fingerprint_file(path, stat.st_size, chunk_size, boundary)
+    fingerprint = FileFingerprint(stat.st_size, stat.st_mtime_ns, hashes, baseline.duration, chunk_size)
+    if stat.st_size < baseline.size: return 'full', None, fingerprint, "File shrank since it was last verified."
+    changed = []
+    for index, old_hash in enumerate(baseline.hashes):
+        # The old last chunk may have been partial; compare only the bytes it covered back then.
+        grown_partial = index == len(baseline.hashes) - 1 and boundary is not None and stat.st_size > baseline.size
+        if (boundary_hash if grown_partial else hashes[index]) != old_hash: changed.append(index)
+    if not changed and stat.st_size == baseline.size:
+        return 'unchanged', None, fingerprint, "File contents unchanged since it was last verified."
+    if 0 in changed: return 'full', None, fingerprint, "File header changed since it was last verified."
+    if os.path.splitext(path)[1].lower() in INDEXED_CONTAINERS:
+        return 'full', None, fingerprint, "Container index may have changed since the file was last verified."
+    if not baseline.duration or not baseline.size:
+        return 'full', None, fingerprint, "No verified duration to map changed bytes to time."
+    seconds_per_byte = baseline.duration / baseline.size
+    first_changed = changed[0] * chunk_size if changed else baseline.size
+    start = max(0.0, first_changed * seconds_per_byte - INCREMENTAL_MARGIN_SECONDS)
+    end = None
+    if stat.st_size == baseline.size:
+        end = min(baseline.duration, (changed[-1] + 1) * chunk_size * seconds_per_byte + INCREMENTAL_MARGIN_SECONDS)
+    if start <= INCREMENTAL_MARGIN_SECONDS: return 'full', None, fingerprint, "Changes start near the beginning of the file."
+    span = f"{start:.1f}s to {end:.1f}s" if end is not None else f"{start:.1f}s to the end"
+    reason = f"Grew by {stat.st_size - baseline.size} bytes" if stat.st_size > baseline.size and not changed else f"{len(changed)} changed chunk(s)"
+    return 'range', (start, end), fingerprint, f"{reason}; decoding {span} only."
+
+# --- A/V Timeline Analysis ---
+PTS_GAP_MIN_SECONDS = 0.010  # smaller presentation gaps are rounding noise
+AV_DRIFT_THRESHOLD = 0.100   # seconds of audio/video misalignment reported as drift
+PTS_REORDER_WINDOW = 16      # packets buffered to restore presentation order (B-frame reordering)
+FFMPEG_LOG_LEVEL = re.compile(r'\[(panic|fatal|error|warning)\] ')
+
+def parse_framehash_line(line):
+    """Parses a framecrc/framemd5 line into ('header', key, index, value) or ('packet', index, dts, pts, duration, size, hash)."""
+    if line.startswith('#'):
+        key, _, value = line[1:].partition(':'); name, _, index = key.partition(' ')
+        return ('header', name, int(index) if index.strip().isdigit() else None, value.strip())
+    fields = [field.strip() for field in line.split(',', 6)]
+    if len(fields) < 6: return None
+    try: return ('packet', int(fields[0]), int(fields[1]), int(fields[2]), int(fields[3]), int(fields[4]), fields[5])
+    except ValueError: return None
+
+class StreamTimeline:
+    """Presentation-time continuity of one stream, built incrementally from its packets."""
+    def __init__(self, time_base, media_type):
+        self.time_base = time_base; self.media_type = media_type or 'unknown'
+        self.first = self.end = None
+        self.last_dts = None; self.dts_errors = 0
+        self.pending = []  # min-heap of (pts, duration) not yet in presentation order
+        self.prev_time = self.prev_duration = self.step = None
+        self.gaps = 0; self.largest_gap = 0.0; self.first_gap_at = None; self.gap_total = 0.0
+        self.content = 0.0  # sum of packet durations: the stream's own clock (exact for audio samples)
+
+    def add(self, dts, pts, duration):
+        if self.last_dts is not None and dts < self.last_dts: self.dts_errors += 1
+        self.last_dts = dts
+        heapq.heappush(self.pending, (pts, duration))
+        if len(self.pending) > PTS_REORDER_WINDOW: self._present(*heapq.heappop(self.pending))
+        return pts * self.time_base
+
+    def flush(self):
+        while self.pending: self._present(*heapq.heappop(self.pending))
+
+    def _present(self, pts, duration):
+        t, d = pts * self.time_base, duration * self.time_base
+        if self.first is None: self.first = t
+        if self.prev_time is not None:
+            delta = t - self.prev_time
+            if delta > 0: self.step = delta if self.step is None else min(self.step, delta)
+            frame = self.prev_duration or self.step or 0.0
+            gap = t - (self.prev_time + frame)
+            if frame and gap > max(PTS_GAP_MIN_SECONDS, frame / 2):
+                self.gaps += 1; self.largest_gap = max(self.largest_gap, gap); self.gap_total += gap
+                if self.first_gap_at is None: self.first_gap_at = self.prev_time + frame
+        self.prev_time, self.prev_duration = t, d; self.content += d
+        self.end = max(self.end if self.end is not None else t, t + d)
+
+class TimelineAnalyzer:
+    """Consumes a framecrc/framemd5 packet listing as it streams and reports PTS gaps, non-monotonic DTS and A/V drift."""
+    def __init__(self, drift_threshold=AV_DRIFT_THRESHOLD):
+        self.drift_threshold = drift_threshold
+        self.time_bases = {}; self.media_types = {}; self.streams = {}
+        self.warnings = []  # ffmpeg warning lines, appended from the stderr reader thread
+
+    def feed(self, line):
+        """Consumes one output line; returns the presentation time it reached in seconds, or None."""
+        parsed = parse_framehash_line(line)
+        if parsed is None: return None
+        if parsed[0] == 'header':
+            _, name, index, value = parsed
+            if name == 'tb' and index is not None:
+                num, _, den = value.partition('/')
+                try: self.time_bases[index] = int(num) / int(den)
+                except (ValueError, ZeroDivisionError): pass
+            elif name == 'media_type' and index is not None: self.media_types[index] = value
+            return None
+        _, index, dts, pts, duration, _, _ = parsed
+        stream = self.streams.get(index)
+        if stream is None: stream = self.streams[index] = StreamTimeline(self.time_bases.get(index, 1.0), self.media_types.get(index))
+        return stream.add(dts, pts, duration)
+
+    def issues(self):
+        """Returns one line per problem found; call once the listing is complete."""
+        issues = []
+        # ffmpeg corrects backwards DTS before muxing, so those only show up as warnings naming the output stream.
+        for warning in self.warnings:
+            match = re.search(r'[av]ost#0:(\d+)', warning)
+            if match and re.search(r'non.?monoton', warning, re.I) and int(match.group(1)) in self.streams:
+                self.streams[int(match.group(1))].dts_errors += 1
+        for index, stream in sorted(self.streams.items()):
+            stream.flush(); label = f"stream {index} ({stream.media_type})"
+            if stream.gaps:
+                issues.append(f"PTS gap: {label} has {stream.gaps} gap(s), largest {stream.largest_gap:.3f}s, first at {stream.first_gap_at:.2f}s")
+            if stream.dts_errors: issues.append(f"Non-monotonic DTS: {label} went backwards {stream.dts_errors} time(s)")
+        video = next((s for _, s in sorted(self.streams.items()) if s.media_type == 'video' and s.first is not None), None)
+        audio = next((s for _, s in sorted(self.streams.items()) if s.media_type == 'audio' and s.first is not None), None)
+        if video and audio:
+            start_offset = audio.first - video.first
+            if abs(start_offset) > self.drift_threshold: issues.append(f"A/V drift: audio starts {start_offset:+.3f}s relative to video")
+            # Audio timestamps that run faster or slower than its samples drift away from video as playback goes on.
+            clock_drift = (audio.end - audio.first) - audio.content - audio.gap_total
+            if abs(clock_drift) > self.drift_threshold:
+                issues.append(f"A/V drift: audio timestamps drift {clock_drift:+.3f}s from its sample clock over {audio.end - audio.first:.1f}s")
+        return issues
+
+# --- Frame Checksums ---
+CHECKSUM_MAGIC = b'AVFC'
+CHECKSUM_VERSION = 1
+CHECKSUM_HEADER = struct.Struct('<4sHqqH')  # magic, version, source size, source mtime_ns, stream count
+CHECKSUM_STREAM = struct.Struct('<Bii')     # media type, time base numerator, denominator
+CHECKSUM_RECORD = struct.Struct('<Bq16s')   # stream index, pts, MD5 of the decoded frame
+CHECKSUM_MEDIA_TYPES = ['video', 'audio', 'other']
+
+def checksum_reference_path(path):
+    """Where the frame checksum reference of a media file is kept."""
+    key = hashlib.blake2b(os.path.normcase(os.path.abspath(path)).encode('utf-8'), digest_size=16).hexdigest()
+    return os.path.join(app_data_dir(), 'checksums', key + '.avfc')
+
+def read_checksum_reference(reference_path):
+    """Returns ([(media type, time base)], {stream: (array of pts, bytes of concatenated digests)})."""
+    with open(reference_path, 'rb') as f:
+        magic, version, _, _, stream_count = CHECKSUM_HEADER.unpack(f.read(CHECKSUM_HEADER.size))
+        if magic != CHECKSUM_MAGIC or version != CHECKSUM_VERSION: raise ValueError("not a frame checksum reference")
+        streams = []
+        for _ in range(stream_count):
+            media_type, num, den = CHECKSUM_STREAM.unpack(f.read(CHECKSUM_STREAM.size))
+            streams.append((CHECKSUM_MEDIA_TYPES[min(media_type, 2)], num / den if den else 1.0))
+        frames = {index: (array('q'), bytearray()) for index in range(stream_count)}
+        while True:
+            block = f.read(CHECKSUM_RECORD.size * 4096)
+            if not block: break
+            for index, pts, digest in CHECKSUM_RECORD.iter_unpack(block[:len(block) - len(block) % CHECKSUM_RECORD.size]):
+                if index in frames: frames[index][0].append(pts); frames[index][1].extend(digest)
+    return streams, {index: (pts, bytes(digests)) for index, (pts, digests) in frames.items()}
+
+class FrameChecksumSession:
+    """Records or verifies the framemd5 listing of one check as it streams.
+
+    'record' writes the reference to a temporary file that replaces the old one only if the check succeeds.
+    'verify' compares each decoded frame with the reference and sets `mismatch` at the first difference;
+    a file without a reference gets one recorded instead, noted in `note`.
+    """
+    def __init__(self, path, mode):
+        self.path = path; self.reference_path = checksum_reference_path(path)
+        self.mode = mode if mode == 'record' or os.path.exists(self.reference_path) else 'record'
+        self.note = None if self.mode == mode else "No frame checksum reference existed; recorded one from this check."
+        self.mismatch = None
+        self.time_bases = {}; self.media_types = {}; self.counts = {}
+        self.reference = self.writer = None; self.pending = []
+        if self.mode == 'verify':
+            try: self.reference = read_checksum_reference(self.reference_path)
+            except (OSError, ValueError, struct.error) as e: self.mismatch = f"Checksum mismatch: reference unreadable ({e})"
+
+    def _label(self, index):
+        return f"stream {index} ({self.media_types.get(index, 'unknown')})"
+
+    def feed(self, line):
+        """Consumes one framemd5 line; returns the presentation time it reached in seconds, or None."""
+        parsed = parse_framehash_line(line)
+        if parsed is None or self.mismatch: return None
+        if parsed[0] == 'header':
+            _, name, index, value = parsed
+            if name == 'tb' and index is not None:
+                num, _, den = value.partition('/'); self.time_bases[index] = (int(num), int(den or 1))
+            elif name == 'media_type' and index is not None: self.media_types[index] = value
+            return None
+        _, index, _, pts, _, _, hexdigest = parsed
+        try: digest = bytes.fromhex(hexdigest.split(',')[0].strip())
+        except ValueError: return None
+        num, den = self.time_bases.get(index, (1, 1)); seconds = pts * num / den if den else 0.0
+        ordinal = self.counts.get(index, 0); self.counts[index] = ordinal + 1
+        if self.mode == 'record': self._write(index, pts, digest)
+        else:
+            streams, frames = self.reference
+            expected = frames.get(index)
+            if expected is None or ordinal >= len(expected[0]):
+                self.mismatch = f"Checksum mismatch: {self._label(index)} has more frames than the reference (frame {ordinal} at {seconds:.3f}s)"
+            elif expected[1][ordinal * 16:ordinal * 16 + 16] != digest or expected[0][ordinal] != pts:
+                self.mismatch = f"Checksum mismatch: {self._label(index)} frame {ordinal} at {seconds:.3f}s differs from the reference"
+        return seconds
+
+    def _write(self, index, pts, digest):
+        if self.writer is None:
+            os.makedirs(os.path.dirname(self.reference_path), exist_ok=True)
+            self.writer = open(self.reference_path + '.tmp', 'wb')
+            try: st = os.stat(self.path); size, mtime_ns = st.st_size, st.st_mtime_ns
+            except OSError: size = mtime_ns = 0
+            stream_count = max(self.time_bases, default=-1) + 1
+            self.writer.write(CHECKSUM_HEADER.pack(CHECKSUM_MAGIC, CHECKSUM_VERSION, size, mtime_ns, stream_count))
+            for stream in range(stream_count):
+                num, den = self.time_bases.get(stream, (1, 1)); media_type = self.media_types.get(stream, 'other')
+                self.writer.write(CHECKSUM_STREAM.pack(CHECKSUM_MEDIA_TYPES.index(media_type) if media_type in CHECKSUM_MEDIA_TYPES else 2, num, den))
+        self.pending.append(CHECKSUM_RECORD.pack(index, pts, digest))
+        if len(self.pending) >= 4096: self.writer.write(b''.join(self.pending)); self.pending.clear()
+
+    def abort(self):
+        """Closes and deletes an unfinished reference; does nothing once finish() has stored or removed it."""
+        if self.writer is None: return
+        self.writer.close(); self.writer = None; self.pending.clear()
+        try: os.remove(self.reference_path + '.tmp')
+        except OSError: pass
+
+    def finish(self, is_success):
+        """Completes the session; returns mismatch lines for frames the reference has but the check did not produce."""
+        if self.mode == 'record':
+            if self.writer is None: return []
+            self.writer.write(b''.join(self.pending)); self.writer.close(); self.writer = None; self.pending.clear()
+            if is_success: os.replace(self.reference_path + '.tmp', self.reference_path)
+            else: os.remove(self.reference_path + '.tmp')
+            return []
+        if self.mismatch: return [self.mismatch]
+        streams, frames = self.reference
+        return [f"Checksum mismatch: {self._label(index)} ended after {self.counts.get(index, 0)} of {len(pts)} reference frames"
+                for index, (pts, _) in sorted(frames.items()) if self.counts.get(index, 0) < len(pts)]
+
+# --- Check Policies ---
+# Container family of each extension, so rules can match on container without probing files.
+CONTAINER_FORMATS = {
+    '.mp4': 'mp4', '.m4v': 'mp4', '.3gp': 'mp4', '.mov': 'mov', '.mkv': 'matroska', '.webm': 'matroska',
+    '.ts': 'mpegts', '.m2ts': 'mpegts', '.mts': 'mpegts', '.avi': 'avi', '.mpg': 'mpeg', '.mpeg': 'mpeg', '.vob': 'mpeg',
+    '.flv': 'flv', '.wmv': 'asf', '.asf': 'asf', '.mxf': 'mxf',
+}
+
+# Errors that mean a policy file is unreadable or invalid (tomllib's TOMLDecodeError is a ValueError).
+POLICY_ERRORS = (OSError, ValueError, TypeError) + ((yaml.YAMLError,) if yaml else ())
+
+def set_media_extensions(extra=()):
+    """Resets MEDIA_EXTENSIONS (in place, so every user sees it) to the defaults plus `extra`."""
+    MEDIA_EXTENSIONS.clear(); MEDIA_EXTENSIONS.update(DEFAULT_MEDIA_EXTENSIONS)
+    MEDIA_EXTENSIONS.update(extra)
+
+def parse_size(value):
+    """Parses a byte count such as 1048576, '500MB', '1.5G' or '20k'."""
+    if isinstance(value, (int, float)): return int(value)
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([kmgt]?)i?b?\s*', str(value), re.I)
+    if not match: raise ValueError(f"invalid size {value!r}")
+    return int(float(match.group(1)) * 1024 ** ' kmgt'.index(match.group(2).lower() or ' '))
+
+def _as_list(value):
+    if value is None: return []
+    return [value] if isinstance(value, (str, int, float)) else list(value)
+
+def _normalize_extension(ext): return ('.' + str(ext).lower().lstrip('.')) if ext else ''
+
+class PolicyRule:
+    """One [[rules]] entry of a policy file: match conditions and the check settings they select."""
+    MODES = {'full', 'tail', 'demux'}
+
+    def __init__(self, spec, index, classes):
+        self.name = str(spec.get('name') or f"rule {index + 1}")
+        unknown = set(spec) - {'name', 'paths', 'extensions', 'containers', 'min_size', 'max_size',
+                               'mode', 'profile', 'tail_seconds', 'timeout', 'priority', 'class', 'analyze', 'checksums'}
+        if unknown: raise ValueError(f"{self.name}: unknown key(s) {', '.join(sorted(unknown))}")
+        # Patterns containing a slash match the whole path, others only the file name; '*' also crosses folders.
+        patterns = [os.path.normcase(str(p)).replace('\\', '/') for p in _as_list(spec.get('paths'))]
+        path_globs = [fnmatch.translate(p) for p in patterns if '/' in p]; name_globs = [fnmatch.translate(p) for p in patterns if '/' not in p]
+        self.path_pattern = re.compile('|'.join(path_globs)) if path_globs else None
+        self.name_pattern = re.compile('|'.join(name_globs)) if name_globs else None
+        self.extensions = {_normalize_extension(e) for e in _as_list(spec.get('extensions'))}
+        self.containers = {str(c).lower() for c in _as_list(spec.get('containers'))}
+        self.min_size = parse_size(spec['min_size']) if spec.get('min_size') is not None else None
+        self.max_size = parse_size(spec['max_size']) if spec.get('max_size') is not None else None
+        self.needs_size = self.min_size is not None or self.max_size is not None
+        self.mode = spec.get('mode')
+        if self.mode is not None and self.mode not in self.MODES: raise ValueError(f"{self.name}: mode must be one of {', '.join(sorted(self.MODES))}")
+        self.profile = spec.get('profile')
+        if self.profile is not None and self.profile not in CHECK_PROFILES: raise ValueError(f"{self.name}: profile must be one of {', '.join(CHECK_PROFILES)}")
+        self.tail_seconds = int(spec['tail_seconds']) if spec.get('tail_seconds') else None
+        self.timeout = float(spec['timeout']) if spec.get('timeout') else None
+        self.analyze = bool(spec['analyze']) if 'analyze' in spec else None
+        self.checksums = spec.get('checksums')
+        if self.checksums not in (None, 'off', 'record', 'verify'): raise ValueError(f"{self.name}: checksums must be off, record or verify")
+        self.priority = int(spec.get('priority', 0))
+        self.check_class = str(spec.get('class', 'default'))
+        if self.check_class != 'default' and self.check_class not in classes: raise ValueError(f"{self.name}: undefined class {self.check_class!r}")
+
+    def matches(self, path, ext, size):
+        if self.containers and CONTAINER_FORMATS.get(ext) not in self.containers: return False
+        if self.needs_size:
+            if size is None: return False
+            if self.min_size is not None and size < self.min_size: return False
+            if self.max_size is not None and size > self.max_size: return False
+        if self.path_pattern or self.name_pattern:
+            normalized = os.path.normcase(path).replace('\\', '/')
+            if not ((self.path_pattern and self.path_pattern.match(normalized))
+                    or (self.name_pattern and self.name_pattern.match(normalized.rsplit('/', 1)[-1]))): return False
+        return True
+
+    def apply(self, options):
+        """Returns a copy of the options with this rule's settings applied."""
+        changes = {}
+        if self.mode: changes.update(fast_check=self.mode == 'tail', demux=self.mode == 'demux')
+        if self.profile: changes['profile'] = self.profile
+        if self.tail_seconds: changes['fast_duration'] = self.tail_seconds
+        if self.timeout: changes['timeout'] = self.timeout
+        if self.analyze is not None: changes['analyze'] = self.analyze
+        if self.checksums: changes['checksums'] = None if self.checksums == 'off' else self.checksums
+        return options.replace(**changes)
+
+class CheckPolicy:
+    """Rules loaded from a TOML or YAML policy file. The first matching rule sets a job's check settings;
+    files no rule matches use the settings chosen in the main window."""
+    def __init__(self, data=None, path=None):
+        data = data or {}
+        self.path = path
+        self.extensions = {_normalize_extension(e) for e in _as_list(data.get('extensions'))}
+        self.classes = {str(name): max(1, int(limit)) for name, limit in (data.get('classes') or {}).items()}
+        self.rules = [PolicyRule(spec, index, self.classes) for index, spec in enumerate(_as_list(data.get('rules')))]
+        self._by_extension = {}  # extension -> (candidate rules in file order, whether any needs the file size)
+
+    @classmethod
+    def load(cls, path):
+        ext = os.path.splitext(path)[1].lower()
+        if ext == '.toml':
+            if tomllib is None: raise ValueError("TOML policy files need Python 3.11 or newer; use YAML instead.")
+            with open(path, 'rb') as f: data = tomllib.load(f)
+        elif ext in ('.yaml', '.yml'):
+            if yaml is None: raise ValueError("YAML policy files need PyYAML (pip install pyyaml).")
+            with open(path, encoding='utf-8') as f: data = yaml.safe_load(f)
+        else: raise ValueError("Policy files must be .toml, .yaml or .yml.")
+        if data is not None and not isinstance(data, dict): raise ValueError("The policy file must contain a table/mapping at the top level.")
+        return cls(data, path)
+
+    def match(self, path, size=None):
+        """Returns the first rule matching the file, or None."""
+        ext = os.path.splitext(path)[1].lower()
+        entry = self._by_extension.get(ext)
+        if entry is None:
+            candidates = [rule for rule in self.rules if not rule.extensions or ext in rule.extensions]
+            entry = self._by_extension[ext] = (candidates, any(rule.needs_size for rule in candidates))
+        candidates, needs_size = entry
+        if needs_size and size is None:
+            try: size = os.path.getsize(path)
+            except OSError: pass
+        return next((rule for rule in candidates if rule.matches(path, ext, size)), None)
+
+# --- Repair Engine ---
+REPAIR_STRATEGIES = {
+    # name: (label, input options, output options)
+    'copy': ("Copy (Fastest, Stream Copy)", [], ['-c', 'copy']),
+    'conceal': ("Copy, Ignoring Errors (Drops Corrupt Packets)", ['-err_detect', 'ignore_err', '-fflags', '+genpts+discardcorrupt'], ['-c', 'copy']),
+    'h264': ("Re-encode (H.264, Slow, More Compatible)", [], ['-c:v', 'libx264', '-preset', 'medium', '-crf', '23', '-c:a', 'aac']),
+    'h265': ("Re-encode (H.265, Slower, Smaller File)", [], ['-c:v', 'libx265', '-preset', 'medium', '-crf', '28', '-c:a', 'aac']),
+}
+
+def build_repair_command(in_file, out_file, strategy):
+    _, input_options, output_options = REPAIR_STRATEGIES[strategy]
+    return [FFMPEG.ffmpeg, *input_options, '-i', in_file, *output_options, out_file]
+
+def repair_output_path(in_file, suffix="_repaired", taken=()):
+    """Picks an output path next to the input that neither exists nor is already claimed."""
+    base, ext = os.path.splitext(in_file); candidate = f"{base}{suffix}{ext}"; n = 2
+    while os.path.exists(candidate) or candidate in taken: candidate = f"{base}{suffix}_{n}{ext}"; n += 1
+    return candidate
+
+# --- Metrics ---
+class CheckMetrics:
+    """Thread-safe aggregate of check lifecycle metrics, exportable as Prometheus text or JSON."""
+    BUCKETS = [0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, float('inf')]
+    PHASES = {'queue_wait': "Time from enqueue until a worker picked the job up",
+              'startup': "Time from launching ffmpeg until its first progress report",
+              'run': "Time ffmpeg spent checking the file",
+              'ui_latency': "Time from the worker finishing until the UI handled the result"}
+    THROUGHPUT_WINDOW = 60
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {phase: [0] * len(self.BUCKETS) for phase in self.PHASES}
+        self.sums = {phase: 0.0 for phase in self.PHASES}
+        self.results = {status: 0 for status in ('ok', 'failed')}
+        self.bytes_total = 0; self.cpu_seconds_total = 0.0; self.max_rss_kb = 0
+        self.enqueued = self.started = self.finished = 0
+        self.recent = []  # (monotonic time, bytes) of checks finished within THROUGHPUT_WINDOW
+
+    def job_enqueued(self, count=1):
+        with self.lock: self.enqueued += count
+
+    def job_started(self):
+        with self.lock: self.started += 1
+
+    def job_finished(self, timing, is_success, was_started=True):
+        with self.lock:
+            if was_started: self.finished += 1
+            else: self.enqueued = max(self.started, self.enqueued - 1)
+            self.results['ok' if is_success else 'failed'] += 1
+            for phase, seconds in timing.phases().items():
+                self.sums[phase] += seconds
+                self.histograms[phase][next(i for i, bound in enumerate(self.BUCKETS) if seconds <= bound)] += 1
+            self.bytes_total += timing.file_size
+            if timing.user_cpu is not None: self.cpu_seconds_total += timing.user_cpu + timing.system_cpu
+            if timing.max_rss_kb: self.max_rss_kb = max(self.max_rss_kb, timing.max_rss_kb)
+            now = time.monotonic(); self.recent.append((now, timing.file_size))
+            self.recent = [entry for entry in self.recent if now - entry[0] <= self.THROUGHPUT_WINDOW]
+
+    def reset_queue(self):
+        """Drops queue accounting after a batch ends, e.g. when queued jobs were cancelled."""
+        with self.lock: self.enqueued = self.started = self.finished = 0
+
+    def snapshot(self):
+        with self.lock:
+            now = time.monotonic(); recent = [entry for entry in self.recent if now - entry[0] <= self.THROUGHPUT_WINDOW]
+            return {
+                'queue_depth': max(0, self.enqueued - self.started), 'running': max(0, self.started - self.finished),
+                'checks_total': dict(self.results), 'bytes_checked_total': self.bytes_total,
+                'child_cpu_seconds_total': round(self.cpu_seconds_total, 3), 'child_max_rss_kb': self.max_rss_kb,
+                'throughput_files_per_second': round(len(recent) / self.THROUGHPUT_WINDOW, 4),
+                'throughput_bytes_per_second': round(sum(size for _, size in recent) / self.THROUGHPUT_WINDOW, 1),
+                'phases': {phase: {'count': sum(self.histograms[phase]), 'sum_seconds': round(self.sums[phase], 6),
+                                   'buckets': {('+Inf' if bound == float('inf') else str(bound)): count
+                                               for bound, count in zip(self.BUCKETS, self._cumulative(self.histograms[phase]))}}
+                           for phase in self.PHASES},
+            }
+
+    @staticmethod
+    def _cumulative(counts):
+        total, out = 0, []
+        for count in counts: total += count; out.append(total)
+        return out
+
+    def to_prometheus(self):
+        snap = self.snapshot(); lines = []
+        def metric(name, kind, help_text, samples):
+            lines.extend([f"# HELP avic_{name} {help_text}", f"# TYPE avic_{name} {kind}"])
+            lines.extend(f"avic_{name}{labels} {value}" for labels, value in samples)
+        metric('queue_depth', 'gauge', "Jobs waiting for a worker.", [('', snap['queue_depth'])])
+        metric('running_checks', 'gauge', "Checks currently running.", [('', snap['running'])])
+        metric('checks_total', 'counter', "Completed checks by result.", [(f'{{result="{k}"}}', v) for k, v in snap['checks_total'].items()])
+        metric('bytes_checked_total', 'counter', "Bytes of media checked.", [('', snap['bytes_checked_total'])])
+        metric('child_cpu_seconds_total', 'counter', "CPU seconds used by ffmpeg children.", [('', snap['child_cpu_seconds_total'])])
+        metric('child_max_rss_kilobytes', 'gauge', "Largest peak RSS of any ffmpeg child.", [('', snap['child_max_rss_kb'])])
+        metric('throughput_files_per_second', 'gauge', f"Checks finished per second over the last {self.THROUGHPUT_WINDOW}s.", [('', snap['throughput_files_per_second'])])
+        metric('throughput_bytes_per_second', 'gauge', f"Bytes checked per second over the last {self.THROUGHPUT_WINDOW}s.", [('', snap['throughput_bytes_per_second'])])
+        for phase, help_text in self.PHASES.items():
+            data = snap['phases'][phase]; name = f'{phase}_seconds'
+            samples = [(f'_bucket{{le="{le}"}}', count) for le, count in data['buckets'].items()]
+            samples += [('_sum', data['sum_seconds']), ('_count', data['count'])]
+            metric(name, 'histogram', help_text + ".", samples)
+        return "\n".join(lines) + "\n"
+
+class MetricsServer:
+    """Serves CheckMetrics at /metrics (Prometheus text format) and /metrics.json."""
+    def __init__(self, metrics, port, host='127.0.0.1'):
+        metrics_ref = metrics
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/metrics': body, content_type = metrics_ref.to_prometheus(), 'text/plain; version=0.0.4'
+                elif self.path == '/metrics.json': body, content_type = json.dumps(metrics_ref.snapshot(), indent=2), 'application/json'
+                else: self.send_error(404); return
+                data = body.encode('utf-8')
+                self.send_response(200); self.send_header('Content-Type', content_type); self.send_header('Content-Length', str(len(data)))
+                self.end_headers(); self.wfile.write(data)
+            def log_message(self, *args): pass
+        self.httpd = ThreadingHTTPServer((host, port), Handler); self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def start(self): self.thread.start()
+
+    def stop(self): self.httpd.shutdown(); self.httpd.server_close()
 
 # --- Worker for QThreadPool ---
 class WorkerSignals(QObject):
     started = pyqtSignal(int)
-    finished = pyqtSignal(int, bool, str)
+    finished = pyqtSignal(int, bool, str, object)
 
 class RunnableFFmpegWorker(QRunnable):
-    def __init__(self, job_index, job_path, fast_check, fast_duration):
+    def __init__(self, job_index, job_path, options, timing, baseline=None):
         super().__init__()
         self.job_index = job_index
         self.job_path = job_path
-        self.fast_check = fast_check
-        self.fast_duration = fast_duration
+        self.options = options
+        self.timing = timing
+        self.baseline = baseline  # FileFingerprint from the last successful check, for incremental rechecks
         self.signals = WorkerSignals()
 
     def run(self):
         if not os.path.exists(self.job_path):
-            self.signals.finished.emit(self.job_index, False, "Error: File not found at path.")
+            self.timing.finished = time.monotonic()
+            self.signals.finished.emit(self.job_index, False, "Error: File not found at path.", None)
             return
+        self.timing.started = time.monotonic()
         self.signals.started.emit(self.job_index)
         try:
-            command = ['ffmpeg']
-            if self.fast_check:
-                command.extend(['-sseof', f'-{self.fast_duration}'])
-            command.extend(['-v', 'error', '-i', self.job_path, '-f', 'null', '-'])
-            process = subprocess.run(
-                command, capture_output=True, text=True, check=False,
-                creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == 'win32' else 0
-            )
-            is_success = process.returncode == 0 and not process.stderr
-            details = process.stderr.strip() or "OK"
-            self.signals.finished.emit(self.job_index, is_success, details)
+            stat = os.stat(self.job_path); self.timing.file_size = stat.st_size
+            options, fingerprint, note = self.options, None, None
+            if self.options.incremental and self.baseline and self.options.decodes_whole_file:
+                plan, time_range, fingerprint, note = plan_incremental_check(self.job_path, self.baseline, stat)
+                if plan == 'unchanged':
+                    self.timing.finished = time.monotonic()
+                    result = CheckResult(self.job_path, 'OK', stat.st_size, self.baseline.duration, self.baseline.codec,
+                                         check_mode='incremental', elapsed_seconds=0.0)
+                    result.fingerprint = fingerprint
+                    self.signals.finished.emit(self.job_index, True, note, result); return
+                if plan == 'range': options = self.options.for_range(*time_range)
+            media_info = probe_media(self.job_path)
+            is_success, details = run_check(self.job_path, options, self.timing, media_video_stream(media_info).get('codec_name'))
+            result = build_check_result(self.job_path, is_success, details, options, self.timing, media_info)
+            # Only full-profile checks establish a baseline; reduced profiles do not verify every frame.
+            if is_success and self.options.incremental and self.options.decodes_whole_file and self.options.profile == 'full':
+                if fingerprint is None: fingerprint = FileFingerprint(stat.st_size, stat.st_mtime_ns, fingerprint_file(self.job_path, stat.st_size)[0])
+                if result.duration is None and options.time_range and options.time_range[1] is None and self.timing.decoded_seconds:
+                    result.duration = options.time_range[0] + self.timing.decoded_seconds
+                fingerprint.duration = result.duration or fingerprint.duration; result.fingerprint = fingerprint
+            if note: details = note if is_success else f"[{note}]\n{details}"
+            self.signals.finished.emit(self.job_index, is_success, details, result)
         except Exception as e:
-            self.signals.finished.emit(self.job_index, False, f"A critical error occurred: {e}")
+            self.timing.finished = time.monotonic()
+            self.signals.finished.emit(self.job_index, False, f"A critical error occurred: {e}", None)
+
+# --- Transfer Engine ---
+COPY_CHUNK_SIZE = 64 * 1024 * 1024
+HASH_BUFFER_SIZE = 8 * 1024 * 1024
+
+def reserve_destination(dest_folder, name):
+    """Atomically claims a free file name in dest_folder, adding _copy, _copy2, ... on collision."""
+    base, ext = os.path.splitext(name); n = 1
+    while True:
+        suffix = "" if n == 1 else "_copy" if n == 2 else f"_copy{n - 1}"
+        candidate = os.path.join(dest_folder, f"{base}{suffix}{ext}")
+        try: os.close(os.open(candidate, os.O_CREAT | os.O_EXCL | os.O_WRONLY)); return candidate
+        except FileExistsError: n += 1
+
+def copy_file_data(src, dst, on_bytes, should_stop):
+    """Copies file contents using the cheapest kernel path available, reporting bytes as they are written."""
+    kernel_copies = []
+    if hasattr(os, 'copy_file_range'): kernel_copies.append(lambda in_fd, out_fd, n: os.copy_file_range(in_fd, out_fd, n))
+    if sys.platform.startswith('linux'): kernel_copies.append(lambda in_fd, out_fd, n: os.sendfile(out_fd, in_fd, None, n))
+    with open(src, 'rb', buffering=0) as fsrc, open(dst, 'wb', buffering=0) as fdst:
+        in_fd, out_fd = fsrc.fileno(), fdst.fileno(); remaining = os.fstat(in_fd).st_size
+        for kernel_copy in kernel_copies:
+            try:
+                while remaining > 0 and not should_stop():
+                    copied = kernel_copy(in_fd, out_fd, min(COPY_CHUNK_SIZE, remaining))
+                    if copied == 0: break
+                    remaining -= copied; on_bytes(copied)
+                break
+            except OSError:
+                # Not supported between these filesystems; the next method continues from the current offsets.
+                continue
+        else:
+            buffer = bytearray(HASH_BUFFER_SIZE); view = memoryview(buffer)
+            while not should_stop():
+                read = fsrc.readinto(buffer); written = 0
+                if not read: break
+                while written < read: written += fdst.write(view[written:read])
+                on_bytes(read)
+    shutil.copystat(src, dst)
 
-class MoveWorkerSignals(QObject):
+def file_digest(path):
+    digest = hashlib.blake2b(digest_size=32)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_BUFFER_SIZE), b''): digest.update(chunk)
+    return digest.hexdigest()
+
+class TransferSignals(QObject):
     file_moved = pyqtSignal(str, str)
+    progress = pyqtSignal(object, object)  # bytes done, bytes total (Python ints; may exceed 32 bits)
     finished = pyqtSignal(str)
 
-class RunnableMoveWorker(QRunnable):
-    def __init__(self, jobs_to_move, dest_folder):
+class RunnableTransferWorker(QRunnable):
+    """Moves files into a folder: renames in place on the same device, copies and verifies across devices in parallel."""
+    def __init__(self, paths, dest_folder, parallel=4, verify_hash=False):
         super().__init__()
-        self.jobs_to_move = jobs_to_move
+        self.paths = paths
         self.dest_folder = dest_folder
-        self.signals = MoveWorkerSignals()
+        self.parallel = parallel
+        self.verify_hash = verify_hash
+        self.signals = TransferSignals()
+        self.cancelled = False
+        self.lock = threading.Lock(); self.bytes_done = 0; self.bytes_total = 0; self.last_emit = 0.0
+
+    def cancel(self): self.cancelled = True
+
+    def _add_bytes(self, count):
+        with self.lock:
+            self.bytes_done += count; now = time.monotonic()
+            if now - self.last_emit < 0.2: return
+            self.last_emit = now; done, total = self.bytes_done, self.bytes_total
+        self.signals.progress.emit(done, total)
+
+    def _copy_and_verify(self, src, dest):
+        copy_file_data(src, dest, self._add_bytes, lambda: self.cancelled)
+        if self.cancelled: raise InterruptedError("Cancelled.")
+        if os.path.getsize(src) != os.path.getsize(dest): raise OSError("Size mismatch after copy.")
+        if self.verify_hash and file_digest(src) != file_digest(dest): raise OSError("Checksum mismatch after copy.")
+        os.remove(src)
+
+    def _move_one(self, src):
+        dest = reserve_destination(self.dest_folder, os.path.basename(src))
+        try:
+            try: os.replace(src, dest); same_device = True
+            except OSError: same_device = False
+            if same_device: self._add_bytes(os.path.getsize(dest))
+            else: self._copy_and_verify(src, dest)
+        except BaseException:
+            if os.path.exists(dest) and os.path.exists(src): os.remove(dest)
+            raise
+        self.signals.file_moved.emit(src, dest)
 
     def run(self):
         moved_count, errors = 0, []
-        for job in self.jobs_to_move:
+        os.makedirs(self.dest_folder, exist_ok=True)
+        dest_device = os.stat(self.dest_folder).st_dev; local, remote = [], []
+        for path in self.paths:
             try:
-                dest_path = os.path.join(self.dest_folder, os.path.basename(job.path))
-                if os.path.exists(dest_path):
-                    base, ext = os.path.splitext(dest_path)
-                    dest_path = f"{base}_copy{ext}"
-                shutil.move(job.path, dest_path)
-                self.signals.file_moved.emit(job.path, dest_path)
-                moved_count += 1
-            except Exception as e:
-                errors.append(f"{os.path.basename(job.path)}: {e}")
-        
+                st = os.stat(path); self.bytes_total += st.st_size
+                (local if st.st_dev == dest_device else remote).append(path)
+            except OSError as e: errors.append(f"{os.path.basename(path)}: {e}")
+        self.signals.progress.emit(0, self.bytes_total)
+        # Same-device moves are metadata-only renames, so do them first and serially.
+        with ThreadPoolExecutor(max_workers=max(1, self.parallel)) as executor:
+            futures = [(path, None) for path in local] + [(path, executor.submit(self._move_one, path)) for path in remote]
+            for path, future in futures:
+                try:
+                    if self.cancelled and future is None: continue
+                    future.result() if future else self._move_one(path)
+                    moved_count += 1
+                except InterruptedError: pass
+                except Exception as e: errors.append(f"{os.path.basename(path)}: {e}")
+        self.signals.progress.emit(self.bytes_done, self.bytes_total)
         msg = f"Moved {moved_count} file(s)."
+        if self.cancelled: msg += f" Cancelled; {len(self.paths) - moved_count - len(errors)} file(s) were left in place."
         if errors: msg += "\n\nErrors:\n" + "\n".join(errors)
         self.signals.finished.emit(msg)
 
+class RepairWorkerSignals(QObject):
+    started = pyqtSignal(int)
+    progress = pyqtSignal(int, float)
+    finished = pyqtSignal(int, bool, str)
+
+class RunnableRepairWorker(QRunnable):
+    def __init__(self, repair_index, in_file, out_file, strategy):
+        super().__init__()
+        self.repair_index = repair_index
+        self.in_file = in_file
+        self.out_file = out_file
+        self.strategy = strategy
+        self.signals = RepairWorkerSignals()
+        self.cancelled = False; self.process = None; self.lock = threading.Lock()
+
+    def cancel(self):
+        with self.lock:
+            self.cancelled = True
+            if self.process and self.process.poll() is None: self.process.terminate()
+
+    def run(self):
+        if self.cancelled: self.signals.finished.emit(self.repair_index, False, "Cancelled."); return
+        self.signals.started.emit(self.repair_index)
+        try:
+            duration = media_duration(probe_media(self.in_file))
+            command = build_repair_command(self.in_file, self.out_file, self.strategy)
+            command[1:1] = ['-nostdin', '-v', 'error', '-progress', 'pipe:1', '-nostats']
+            with self.lock:
+                if self.cancelled: self.signals.finished.emit(self.repair_index, False, "Cancelled."); return
+                self.process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, errors='replace', creationflags=NO_WINDOW_FLAGS)
+            stderr_chunks = []
+            stderr_reader = threading.Thread(target=lambda: stderr_chunks.append(self.process.stderr.read()), daemon=True)
+            stderr_reader.start()
+            for line in self.process.stdout:
+                if duration and line.startswith('out_time_us='):
+                    try: self.signals.progress.emit(self.repair_index, min(1.0, int(line.split('=', 1)[1]) / 1e6 / duration))
+                    except ValueError: pass
+            stderr_reader.join(); returncode = self.process.wait()
+            self.process.stdout.close(); self.process.stderr.close()
+            if self.cancelled or returncode != 0:
+                if os.path.exists(self.out_file): os.remove(self.out_file)
+                message = "Cancelled." if self.cancelled else f"FFmpeg exited with code {returncode}.\n{''.join(stderr_chunks).strip()}"
+                self.signals.finished.emit(self.repair_index, False, message); return
+            self.signals.progress.emit(self.repair_index, 1.0)
+            self.signals.finished.emit(self.repair_index, True, ''.join(stderr_chunks).strip())
+        except Exception as e:
+            self.signals.finished.emit(self.repair_index, False, f"A critical error occurred: {e}")
+
+# --- Watch Folders & Schedules ---
+class CronSchedule:
+    """Minimal 5-field cron expression (minute hour day-of-month month day-of-week)."""
+    FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+    def __init__(self, expression):
+        self.expression = expression.strip()
+        fields = self.expression.split()
+        if len(fields) != 5: raise ValueError(f"Expected 5 fields in cron expression, got {len(fields)}: '{expression}'")
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            self._parse_field(field, lo, hi) for field, (lo, hi) in zip(fields, self.FIELD_RANGES))
+        if 7 in self.weekdays: self.weekdays = (self.weekdays - {7}) | {0}
+        self.days_restricted = fields[2] != '*'; self.weekdays_restricted = fields[4] != '*'
+
+    @staticmethod
+    def _parse_field(field, lo, hi):
+        values = set()
+        for part in field.split(','):
+            step = 1
+            if '/' in part:
+                part, step_str = part.split('/', 1); step = int(step_str)
+                if step < 1: raise ValueError(f"Invalid step in cron field '{field}'")
+            if part == '*': start, end = lo, hi
+            elif '-' in part: start, end = (int(v) for v in part.split('-', 1))
+            else: start = int(part); end = hi if step > 1 else start
+            if start < lo or end > hi or start > end: raise ValueError(f"Cron field '{field}' out of range {lo}-{hi}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def matches(self, when):
+        if when.minute not in self.minutes or when.hour not in self.hours or when.month not in self.months: return False
+        day_ok = when.day in self.days; weekday_ok = (when.weekday() + 1) % 7 in self.weekdays
+        # Standard cron semantics: if both day fields are restricted, either may match.
+        if self.days_restricted and self.weekdays_restricted: return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+def scan_media_tree(folders):
+    """Walks the folders; returns (every directory, {media path: (size, mtime)})."""
+    directories = []; signatures = {}
+    for folder in folders:
+        for root, _, files in os.walk(folder):
+            directories.append(root)
+            for name in files:
+                path = os.path.join(root, name)
+                if FolderWatcher._is_media(path):
+                    signature = FolderWatcher._signature(path)
+                    if signature: signatures[path] = signature
+    return directories, signatures
+
+class FolderScanSignals(QObject):
+    finished = pyqtSignal(int, bool, object, object)  # generation, initial, directories, signatures
+
+class RunnableFolderScan(QRunnable):
+    def __init__(self, folders, generation, initial):
+        super().__init__()
+        self.folders = list(folders); self.generation = generation; self.initial = initial
+        self.signals = FolderScanSignals()
+
+    def run(self):
+        directories, signatures = scan_media_tree(self.folders)
+        self.signals.finished.emit(self.generation, self.initial, directories, signatures)
+
+class FolderWatcher(QObject):
+    """Watches folders for new media and reports files once their size has settled.
+
+    QFileSystemWatcher is backed by inotify on Linux (and the native APIs elsewhere);
+    a periodic rescan covers network shares and platforms where notifications are unreliable.
+    The startup snapshot and the rescans walk the trees on a background thread.
+    """
+    files_ready = pyqtSignal(list)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.folders = []; self.stable_seconds = 10
+        self.known = {}    # path -> (size, mtime) of files already reported or present at start
+        self.pending = {}  # path -> (size, mtime, time the signature was first seen)
+        self.watched = set()  # directories registered with fs_watcher
+        self.scan_pool = QThreadPool(self); self.scan_pool.setMaxThreadCount(1)
+        self.scan = None; self.generation = 0  # a scan finishing after stop()/start() belongs to an old generation
+        self.fs_watcher = QFileSystemWatcher(self); self.fs_watcher.directoryChanged.connect(self._scan_directory)
+        self.poll_timer = QTimer(self); self.poll_timer.timeout.connect(self._rescan_all)
+        self.stability_timer = QTimer(self); self.stability_timer.setInterval(1000); self.stability_timer.timeout.connect(self._check_pending)
+
+    def is_active(self): return bool(self.folders)
+
+    def start(self, folders, stable_seconds=10, poll_seconds=60):
+        self.stop()
+        self.folders = [f for f in folders if os.path.isdir(f)]; self.stable_seconds = stable_seconds
+        if not self.folders: return
+        self._start_scan(initial=True)
+        self.poll_timer.start(max(5, poll_seconds) * 1000); self.stability_timer.start()
+
+    def stop(self):
+        self.poll_timer.stop(); self.stability_timer.stop()
+        if self.watched: self.fs_watcher.removePaths(list(self.watched))
+        self.folders = []; self.watched.clear(); self.known.clear(); self.pending.clear()
+        self.generation += 1; self.scan = None
+
+    @staticmethod
+    def _is_media(path): return path.lower().endswith(tuple(MEDIA_EXTENSIONS))
+
+    @staticmethod
+    def _signature(path):
+        try: st = os.stat(path)
+        except OSError: return None
+        return (st.st_size, st.st_mtime)
+
+    def _watch_directory(self, directory):
+        if directory not in self.watched: self.watched.add(directory); self.fs_watcher.addPath(directory)
+
+    def _start_scan(self, initial):
+        self.scan = RunnableFolderScan(self.folders, self.generation, initial)
+        self.scan.signals.finished.connect(self._on_scan_finished)
+        self.scan_pool.start(self.scan)
+
+    def _on_scan_finished(self, generation, initial, directories, signatures):
+        if generation != self.generation: return
+        self.scan = None
+        new_directories = [d for d in directories if d not in self.watched]
+        if new_directories: self.watched.update(new_directories); self.fs_watcher.addPaths(new_directories)
+        # Files present at startup are the baseline; anything a rescan finds that differs is a candidate.
+        if initial: self.known.update(signatures)
+        else:
+            for path, signature in signatures.items(): self._note_candidate(path, signature)
+
+    def _scan_directory(self, directory):
+        try: entries = list(os.scandir(directory))
+        except OSError: return
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.path not in self.watched:
+                        self._watch_directory(entry.path); self._scan_directory(entry.path)
+                elif entry.is_file() and self._is_media(entry.path): self._note_candidate(entry.path)
+            except OSError: continue
+
+    def _rescan_all(self):
+        if self.folders and self.scan is None: self._start_scan(initial=False)
+
+    def _note_candidate(self, path, signature=None):
+        signature = signature or self._signature(path)
+        if signature is None or self.known.get(path) == signature: return
+        previous = self.pending.get(path)
+        if previous is None or previous[:2] != signature: self.pending[path] = (*signature, time.monotonic())
+
+    def _check_pending(self):
+        if not self.pending: return
+        now = time.monotonic(); ready = []
+        for path, (size, mtime, since) in list(self.pending.items()):
+            signature = self._signature(path)
+            if signature is None: del self.pending[path]; continue
+            if signature != (size, mtime): self.pending[path] = (*signature, now); continue
+            if size > 0 and now - since >= self.stable_seconds:
+                del self.pending[path]; self.known[path] = signature; ready.append(path)
+        if ready: self.files_ready.emit(sorted(ready))
+
 # --- Repair Command Dialog ---
 class RepairCommandDialog(QDialog):
     def __init__(self, input_file, parent=None):
@@ -121,13 +1344,13 @@ class RepairCommandDialog(QDialog):
         out_layout.addWidget(self.output_file_edit); layout.addLayout(out_layout)
         codec_layout = QHBoxLayout(); codec_layout.addWidget(QLabel("Method:"))
         self.codec_option = QComboBox()
-        self.codec_option.addItems(["Copy (Fastest, Stream Copy)", "Re-encode (H.264, Slow, More Compatible)", "Re-encode (H.265, Slower, Smaller File)"])
+        for name, (label, _, _) in REPAIR_STRATEGIES.items(): self.codec_option.addItem(label, name)
         codec_layout.addWidget(self.codec_option); layout.addLayout(codec_layout)
         self.command_preview = QTextEdit(); self.command_preview.setReadOnly(True)
         layout.addWidget(QLabel("Generated Command:")); layout.addWidget(self.command_preview)
         button_layout = QHBoxLayout()
         self.copy_button = QPushButton("Copy Command"); self.run_button = QPushButton("Run Repair...")
-        self.run_button.setToolTip("Opens a dialog to confirm before running the command directly.")
+        self.run_button.setToolTip("Confirms, then queues the repair to run in the background.")
         button_layout.addWidget(self.copy_button); button_layout.addWidget(self.run_button)
         layout.addLayout(button_layout)
         self.copy_button.clicked.connect(self.copy_and_close)
@@ -138,25 +1361,178 @@ class RepairCommandDialog(QDialog):
 
     def update_command(self): self.command_preview.setText(" ".join(shlex.quote(arg) for arg in self.get_command(quoted=False)))
 
+    RUN_REPAIR = 2
+
+    def strategy(self): return self.codec_option.currentData()
+
     def get_command(self, quoted=True):
-        out_file = self.output_file_edit.text(); in_file = self.input_file
-        codec = self.codec_option.currentText()
-        if "Copy" in codec: return ['ffmpeg', '-i', in_file, '-c', 'copy', out_file]
-        elif "H.264" in codec: return ['ffmpeg', '-i', in_file, '-c:v', 'libx264', '-preset', 'medium', '-crf', '23', '-c:a', 'aac', out_file]
-        else: return ['ffmpeg', '-i', in_file, '-c:v', 'libx265', '-preset', 'medium', '-crf', '28', '-c:a', 'aac', out_file]
+        return build_repair_command(self.input_file, self.output_file_edit.text(), self.strategy())
         
     def copy_and_close(self): QGuiApplication.clipboard().setText(" ".join(shlex.quote(arg) for arg in self.get_command(quoted=False))); self.accept()
         
     def run_repair(self):
         command_list = self.get_command(quoted=False); command_str = " ".join(shlex.quote(arg) for arg in command_list)
         QGuiApplication.clipboard().setText(command_str)
-        reply = QMessageBox.question(self, "Run Repair", f"This will execute the following command:\n\n{command_str}\n\nThis may take a long time and consume system resources. Are you sure?", QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        reply = QMessageBox.question(self, "Run Repair", f"This will execute the following command in the background:\n\n{command_str}\n\nThis may take a long time and consume system resources. Are you sure?", QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.No: return
-        try:
-            subprocess.run(command_list, capture_output=True, text=True, check=True, creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == 'win32' else 0)
-            QMessageBox.information(self, "Success", f"Repair command completed successfully for:\n{os.path.basename(self.output_file_edit.text())}"); self.accept()
-        except subprocess.CalledProcessError as e: QMessageBox.critical(self, "Error", f"Repair command failed with exit code {e.returncode}.\n\nError Output:\n{e.stderr}")
-        except Exception as e: QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
+        if os.path.exists(self.output_file_edit.text()): QMessageBox.warning(self, "Output Exists", "The output file already exists. Please choose another name."); return
+        self.done(self.RUN_REPAIR)
+
+class BatchRepairDialog(QDialog):
+    def __init__(self, jobs, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Repair Failed Files")
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel(f"Repair {len(jobs)} failed file(s). Outputs are written next to each original."))
+        form = QFormLayout()
+        self.strategy_option = QComboBox()
+        for name, (label, _, _) in REPAIR_STRATEGIES.items(): self.strategy_option.addItem(label, name)
+        self.suffix_edit = QLineEdit("_repaired")
+        self.reverify_box = QCheckBox("Re-verify repaired files afterwards"); self.reverify_box.setChecked(True)
+        form.addRow("Method:", self.strategy_option); form.addRow("Output Suffix:", self.suffix_edit)
+        layout.addLayout(form); layout.addWidget(self.reverify_box)
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        buttons.button(QDialogButtonBox.StandardButton.Ok).setText("Start Repair")
+        layout.addWidget(buttons); buttons.accepted.connect(self.accept); buttons.rejected.connect(self.reject)
+
+    def strategy(self): return self.strategy_option.currentData()
+
+    def suffix(self): return self.suffix_edit.text().strip() or "_repaired"
+
+# --- Watch Folder Dialog ---
+class WatchFolderDialog(QDialog):
+    def __init__(self, settings, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Watch Folders & Schedules")
+        layout = QVBoxLayout(self)
+        self.enabled_box = QCheckBox("Watch folders and check new files automatically")
+        self.enabled_box.setChecked(settings.value("watch/enabled", False, type=bool))
+        layout.addWidget(self.enabled_box)
+        layout.addWidget(QLabel("Watched Folders:"))
+        self.folder_list = QListWidget(); self.folder_list.addItems(settings.value("watch/folders", [], type=list))
+        layout.addWidget(self.folder_list)
+        folder_buttons = QHBoxLayout(); add_button = QPushButton("Add Folder..."); remove_button = QPushButton("Remove")
+        folder_buttons.addWidget(add_button); folder_buttons.addWidget(remove_button); folder_buttons.addStretch()
+        layout.addLayout(folder_buttons)
+        form = QFormLayout()
+        self.stable_spinbox = QSpinBox(); self.stable_spinbox.setRange(1, 3600); self.stable_spinbox.setSuffix("s")
+        self.stable_spinbox.setValue(settings.value("watch/stable_seconds", 10, type=int))
+        self.stable_spinbox.setToolTip("A new file is only checked once its size has not changed for this long.")
+        self.poll_spinbox = QSpinBox(); self.poll_spinbox.setRange(5, 3600); self.poll_spinbox.setSuffix("s")
+        self.poll_spinbox.setValue(settings.value("watch/poll_seconds", 60, type=int))
+        self.poll_spinbox.setToolTip("Interval of the full rescan used for network shares and missed notifications.")
+        self.schedule_edit = QLineEdit(settings.value("schedule/cron", "", type=str)); self.schedule_edit.setPlaceholderText("e.g. 0 3 * * *  (leave empty to disable)")
+        self.schedule_edit.setToolTip("Cron expression: minute hour day-of-month month day-of-week")
+        self.age_spinbox = QSpinBox(); self.age_spinbox.setRange(1, 24 * 365); self.age_spinbox.setSuffix("h")
+        self.age_spinbox.setValue(settings.value("schedule/max_age_hours", 24 * 7, type=int))
+        self.age_spinbox.setToolTip("Scheduled runs re-verify files whose last check is older than this.")
+        form.addRow("Stable For:", self.stable_spinbox); form.addRow("Rescan Every:", self.poll_spinbox)
+        form.addRow("Re-verify Schedule:", self.schedule_edit); form.addRow("Re-verify Older Than:", self.age_spinbox)
+        layout.addLayout(form)
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        layout.addWidget(buttons)
+        add_button.clicked.connect(self.add_folder); remove_button.clicked.connect(self.remove_folder)
+        buttons.accepted.connect(self.accept); buttons.rejected.connect(self.reject)
+
+    def add_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Select Folder to Watch")
+        if folder and not self.folder_list.findItems(folder, Qt.MatchFlag.MatchExactly): self.folder_list.addItem(folder)
+
+    def remove_folder(self):
+        for item in self.folder_list.selectedItems(): self.folder_list.takeItem(self.folder_list.row(item))
+
+    def accept(self):
+        cron = self.schedule_edit.text().strip()
+        if cron:
+            try: CronSchedule(cron)
+            except ValueError as e: QMessageBox.warning(self, "Invalid Schedule", str(e)); return
+        super().accept()
+
+    def save(self, settings):
+        settings.setValue("watch/enabled", self.enabled_box.isChecked())
+        settings.setValue("watch/folders", [self.folder_list.item(i).text() for i in range(self.folder_list.count())])
+        settings.setValue("watch/stable_seconds", self.stable_spinbox.value()); settings.setValue("watch/poll_seconds", self.poll_spinbox.value())
+        settings.setValue("schedule/cron", self.schedule_edit.text().strip()); settings.setValue("schedule/max_age_hours", self.age_spinbox.value())
+
+# --- Move Dialog ---
+class MoveDialog(QDialog):
+    def __init__(self, count, settings, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Move Corrupt Files")
+        layout = QVBoxLayout(self); layout.addWidget(QLabel(f"Move {count} corrupt file(s) to:"))
+        dest_layout = QHBoxLayout(); self.dest_edit = QLineEdit(settings.value("move/last_folder", "", type=str)); browse_button = QPushButton("Browse...")
+        dest_layout.addWidget(self.dest_edit); dest_layout.addWidget(browse_button); layout.addLayout(dest_layout)
+        form = QFormLayout()
+        self.parallel_spinbox = QSpinBox(); self.parallel_spinbox.setRange(1, 32); self.parallel_spinbox.setValue(settings.value("move/parallel", 4, type=int))
+        self.parallel_spinbox.setToolTip("Concurrent copies when the destination is on another drive. Moves on the same drive are instant renames.")
+        self.verify_box = QCheckBox("Verify copies by checksum before deleting originals (slower)")
+        self.verify_box.setChecked(settings.value("move/verify_hash", False, type=bool))
+        form.addRow("Parallel Copies:", self.parallel_spinbox); layout.addLayout(form); layout.addWidget(self.verify_box)
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        layout.addWidget(buttons)
+        browse_button.clicked.connect(self.browse); buttons.accepted.connect(self.accept); buttons.rejected.connect(self.reject)
+
+    def browse(self):
+        folder = QFileDialog.getExistingDirectory(self, "Select Destination for Corrupt Files", self.dest_edit.text())
+        if folder: self.dest_edit.setText(folder)
+
+    def accept(self):
+        if not os.path.isdir(self.dest_edit.text()): QMessageBox.warning(self, "Move Corrupt Files", "Please choose an existing destination folder."); return
+        super().accept()
+
+    def save(self, settings):
+        settings.setValue("move/last_folder", self.dest_edit.text()); settings.setValue("move/parallel", self.parallel_spinbox.value())
+        settings.setValue("move/verify_hash", self.verify_box.isChecked())
+
+# --- Metrics Dialog ---
+class MetricsDialog(QDialog):
+    def __init__(self, settings, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Metrics Export")
+        layout = QVBoxLayout(self); form = QFormLayout()
+        self.http_box = QCheckBox("Serve Prometheus metrics at http://127.0.0.1:<port>/metrics")
+        self.http_box.setChecked(settings.value("metrics/http_enabled", False, type=bool))
+        self.port_spinbox = QSpinBox(); self.port_spinbox.setRange(1024, 65535); self.port_spinbox.setValue(settings.value("metrics/port", 9464, type=int))
+        json_layout = QHBoxLayout(); self.json_path_edit = QLineEdit(settings.value("metrics/json_path", "", type=str))
+        self.json_path_edit.setPlaceholderText("Leave empty to disable"); browse_button = QPushButton("Browse...")
+        json_layout.addWidget(self.json_path_edit); json_layout.addWidget(browse_button)
+        self.interval_spinbox = QSpinBox(); self.interval_spinbox.setRange(1, 3600); self.interval_spinbox.setSuffix("s")
+        self.interval_spinbox.setValue(settings.value("metrics/json_interval", 30, type=int))
+        layout.addWidget(self.http_box); form.addRow("Port:", self.port_spinbox)
+        form.addRow("JSON Dump File:", json_layout); form.addRow("Dump Every:", self.interval_spinbox)
+        layout.addLayout(form)
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        layout.addWidget(buttons)
+        browse_button.clicked.connect(self.browse); buttons.accepted.connect(self.accept); buttons.rejected.connect(self.reject)
+
+    def browse(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Metrics JSON File", self.json_path_edit.text(), "JSON Files (*.json)")
+        if path: self.json_path_edit.setText(path)
+
+    def save(self, settings):
+        settings.setValue("metrics/http_enabled", self.http_box.isChecked()); settings.setValue("metrics/port", self.port_spinbox.value())
+        settings.setValue("metrics/json_path", self.json_path_edit.text().strip()); settings.setValue("metrics/json_interval", self.interval_spinbox.value())
+
+# --- Check Policy Dialog ---
+class PolicyDialog(QDialog):
+    def __init__(self, settings, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Check Policy")
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel("Apply per-file check settings (mode, profile, timeout, priority, concurrency class)\n"
+                                "from rules matching path globs, extensions, containers and file sizes.\nSee the README for the file format."))
+        path_layout = QHBoxLayout(); self.path_edit = QLineEdit(settings.value("policy/path", "", type=str))
+        self.path_edit.setPlaceholderText("No policy: every file uses the main window settings"); browse_button = QPushButton("Browse...")
+        path_layout.addWidget(self.path_edit); path_layout.addWidget(browse_button); layout.addLayout(path_layout)
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        layout.addWidget(buttons)
+        browse_button.clicked.connect(self.browse); buttons.accepted.connect(self.accept); buttons.rejected.connect(self.reject)
+
+    def browse(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Policy File", self.path_edit.text(), "Policy Files (*.toml *.yaml *.yml)")
+        if path: self.path_edit.setText(path)
+
+    def save(self, settings): settings.setValue("policy/path", self.path_edit.text().strip())
 
 ## NEW FEATURE: About Dialog
 class AboutDialog(QDialog):
@@ -196,31 +1572,65 @@ class AboutDialog(QDialog):
         layout.addWidget(link_label)
 
 # --- Main Application Window ---
+DETAILS_PAGE_LINES = 500  # ffmpeg log lines shown per page in the details pane
+
 class VideoBatchCheckerApp(QMainWindow):
     def __init__(self):
         super().__init__()
-        self.jobs = []
+        self.jobs = []; self.job_by_item = {}  # id(list item) -> FileJob
+        self.details_shown = None; self.details_page = 0; self.log_cache = (None, [])  # last rendered (job, details, page); (job key, log lines)
         self.state = AppState.IDLE
         self.jobs_processed = 0
+        self.ffmpeg_ready = False
         
         self.thread_pool = QThreadPool()
         self.max_threads = max(1, os.cpu_count() or 1)
         self.thread_pool.setMaxThreadCount(max(1, self.max_threads // 2))
+        self.settings = QSettings("AVIC", "Advanced Video Integrity Checker")
+        self.folder_watcher = FolderWatcher(self); self.folder_watcher.files_ready.connect(self._enqueue_watched_files)
+        self.pending_watch_paths = []
+        self.schedule = None; self.last_schedule_run = None
+        self.schedule_timer = QTimer(self); self.schedule_timer.setInterval(15 * 1000); self.schedule_timer.timeout.connect(self._check_schedule)
+        self.metrics = CheckMetrics(); self.metrics_server = None
+        self.repairs = []; self.repairs_done = 0; self.repairs_cancelling = False; self.reverify_repairs = True
+        self.transfer_pool = QThreadPool(self); self.transfer_pool.setMaxThreadCount(1)
+        self.transfer_worker = None; self.moving_paths = set()
+        self.metrics_dump_timer = QTimer(self); self.metrics_dump_timer.timeout.connect(self._dump_metrics)
+        self.session_id = uuid.uuid4().hex
+        self.policy = None; self.policy_mtime = None
+        self.dispatch_queues = {}; self.dispatch_seq = 0  # check class -> heap of (-priority, seq, job index)
+        self.active_checks = {}; self.running_by_class = {}  # job index -> check class of running checks
+        store_error = None
+        try: self.result_store = ResultStore()
+        except (sqlite3.Error, OSError) as e: self.result_store = None; store_error = e
+        self.store_commit_timer = QTimer(self); self.store_commit_timer.setInterval(2000)
+        self.store_commit_timer.timeout.connect(lambda: self.result_store and self.result_store.commit()); self.store_commit_timer.start()
 
         self.setWindowTitle("Advanced Video Integrity Checker"); self.setGeometry(100, 100, 900, 700); self.setAcceptDrops(True)
         self._create_menus(); self._init_ui(); self._update_ui_for_state()
-        self._initial_ffmpeg_check()
+        if store_error:
+            QMessageBox.warning(self, "Result History", f"The result index could not be opened: {store_error}\n\n"
+                                "Checks still run, but results are not saved to the history and incremental rechecks are unavailable.")
+        self._resolve_ffmpeg()
+        self._load_policy(); self._apply_watch_settings(); self._apply_metrics_settings()
 
-    def _check_ffmpeg(self):
-        try:
-            subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True, creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == 'win32' else 0)
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError): return False
+    def _resolve_ffmpeg(self):
+        """Locates and probes FFmpeg in the background so the window can show immediately."""
+        self.ffmpeg_ready = False; self._update_ui_for_state()
+        probe = RunnableFFmpegProbe(self.settings.value("ffmpeg/path", "", type=str) or None)
+        probe.signals.finished.connect(self._on_ffmpeg_resolved)
+        self.thread_pool.start(probe)
+
+    def _on_ffmpeg_resolved(self, info):
+        set_ffmpeg_info(info); self.ffmpeg_ready = info.available
+        self._update_ui_for_state()
+        if not info.available:
+            QMessageBox.critical(self, "FFmpeg Not Found", f"{info.error} The application requires FFmpeg to function.\n\nPlease install it and ensure its location is in your system's PATH, place it in the same folder as this script, or set its location via Tools > FFmpeg Location...")
+        elif self.state == AppState.IDLE: self.status_label.setText(f"Using {info.version.split(' Copyright')[0]} ({info.ffmpeg})")
 
-    def _initial_ffmpeg_check(self):
-        if not self._check_ffmpeg():
-            QMessageBox.critical(self, "FFmpeg Not Found", "FFmpeg could not be found. The application requires FFmpeg to function.\n\nPlease install it and ensure its location is in your system's PATH, or place it in the same folder as this script.")
-            self.check_button.setEnabled(False); self.retry_failed_action.setEnabled(False)
+    def choose_ffmpeg_location(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Select FFmpeg Binary", self.settings.value("ffmpeg/path", "", type=str), "All Files (*)")
+        if path: self.settings.setValue("ffmpeg/path", path); self._resolve_ffmpeg()
 
     def _create_menus(self):
         menu_bar = self.menuBar()
@@ -236,7 +1646,15 @@ class VideoBatchCheckerApp(QMainWindow):
         self.retry_failed_action = QAction("&Retry Failed Files", self); self.retry_failed_action.triggered.connect(self.retry_failed)
         self.clear_verified_action = QAction("Clear &Verified Files", self); self.clear_verified_action.triggered.connect(self.clear_verified)
         self.move_corrupt_action = QAction("&Move Corrupt Files...", self); self.move_corrupt_action.triggered.connect(self.move_corrupt_files)
-        tools_menu.addActions([self.retry_failed_action, self.clear_verified_action, self.move_corrupt_action])
+        self.repair_failed_action = QAction("Re&pair Failed Files...", self); self.repair_failed_action.triggered.connect(self.repair_failed)
+        tools_menu.addActions([self.retry_failed_action, self.clear_verified_action, self.move_corrupt_action, self.repair_failed_action])
+        self.watch_folders_action = QAction("&Watch Folders && Schedules...", self); self.watch_folders_action.triggered.connect(self.configure_watch_folders)
+        self.metrics_action = QAction("Metrics &Export...", self); self.metrics_action.triggered.connect(self.configure_metrics)
+        self.policy_action = QAction("Check &Policy...", self); self.policy_action.triggered.connect(self.configure_policy)
+        self.ffmpeg_location_action = QAction("&FFmpeg Location...", self); self.ffmpeg_location_action.triggered.connect(self.choose_ffmpeg_location)
+        self.load_history_action = QAction("Load From &History...", self); self.load_history_action.triggered.connect(self.load_from_history)
+        tools_menu.addSeparator(); tools_menu.addAction(self.load_history_action)
+        tools_menu.addSeparator(); tools_menu.addActions([self.watch_folders_action, self.policy_action, self.metrics_action, self.ffmpeg_location_action])
         # Help Menu (NEW)
         help_menu = menu_bar.addMenu("&Help")
         about_action = QAction("&About...", self)
@@ -250,6 +1668,7 @@ class VideoBatchCheckerApp(QMainWindow):
         self.remove_selected_button = QPushButton("Remove Selected"); self.clear_button = QPushButton("Clear All")
         top_controls_layout.addWidget(self.add_files_button); top_controls_layout.addWidget(self.add_folder_button); top_controls_layout.addStretch(); top_controls_layout.addWidget(self.remove_selected_button); top_controls_layout.addWidget(self.clear_button)
         self.file_list_widget = QListWidget(); self.file_list_widget.setSelectionMode(QListWidget.SelectionMode.ExtendedSelection)
+        self.file_list_widget.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu); self.file_list_widget.customContextMenuRequested.connect(self.show_file_context_menu)
         proc_controls_layout = QHBoxLayout(); proc_controls_layout.addWidget(QLabel("Concurrent Checks:"))
         self.thread_spinbox = QSpinBox(); self.thread_spinbox.setMinimum(1); self.thread_spinbox.setMaximum(self.max_threads)
         self.thread_spinbox.setValue(self.thread_pool.maxThreadCount())
@@ -259,51 +1678,93 @@ class VideoBatchCheckerApp(QMainWindow):
         self.fast_duration_spinbox = QSpinBox(); self.fast_duration_spinbox.setMinimum(10); self.fast_duration_spinbox.setMaximum(600)
         self.fast_duration_spinbox.setValue(60); self.fast_duration_spinbox.setSuffix("s"); self.fast_duration_spinbox.setEnabled(False)
         proc_controls_layout.addWidget(self.fast_duration_spinbox)
+        self.profile_combo = QComboBox()
+        for key, (label, _, _, coverage) in CHECK_PROFILES.items():
+            self.profile_combo.addItem(label, key); self.profile_combo.setItemData(self.profile_combo.count() - 1, coverage, Qt.ItemDataRole.ToolTipRole)
+        self.profile_combo.setToolTip("Check profile: how much of each file is decoded.\nCheaper profiles trade detection coverage for speed; hover an entry for details.\nRight-click files to override the profile per file.")
+        self.profile_combo.setCurrentIndex(max(0, self.profile_combo.findData(self.settings.value("check/profile", "full"))))
+        self.profile_combo.currentIndexChanged.connect(lambda: self.settings.setValue("check/profile", self.profile_combo.currentData()))
+        proc_controls_layout.addWidget(self.profile_combo)
+        self.incremental_box = QCheckBox("Incremental Recheck")
+        self.incremental_box.setToolTip("Remembers a fingerprint of every verified file and, when it is checked again, only decodes the part\nthat was appended or modified since. Files whose header or container index changed are checked in full.")
+        self.incremental_box.setChecked(self.settings.value("check/incremental", False, type=bool))
+        self.incremental_box.toggled.connect(lambda checked: self.settings.setValue("check/incremental", checked))
+        proc_controls_layout.addWidget(self.incremental_box)
+        self.analyze_box = QCheckBox("A/V Analysis")
+        self.analyze_box.setToolTip("While checking, also lists every audio/video packet timestamp and reports PTS gaps (dropped frames,\ndiscontinuities), non-monotonic DTS and audio/video drift over 100 ms. No extra read of the file is needed.")
+        self.analyze_box.setChecked(self.settings.value("check/analyze", False, type=bool))
+        self.analyze_box.toggled.connect(lambda checked: self.settings.setValue("check/analyze", checked))
+        proc_controls_layout.addWidget(self.analyze_box)
+        self.checksum_combo = QComboBox()
+        for label, mode in [("No Checksums", None), ("Record Checksums", 'record'), ("Verify Checksums", 'verify')]: self.checksum_combo.addItem(label, mode)
+        self.checksum_combo.setToolTip("Record: store an MD5 of every decoded frame as the file's reference.\nVerify: compare every decoded frame with the reference and stop at the first mismatch.\nBoth always decode the whole file at full resolution.")
+        self.checksum_combo.setCurrentIndex(max(0, self.checksum_combo.findData(self.settings.value("check/checksums", None))))
+        self.checksum_combo.currentIndexChanged.connect(lambda: self.settings.setValue("check/checksums", self.checksum_combo.currentData()))
+        proc_controls_layout.addWidget(self.checksum_combo)
         self.check_button = QPushButton("Start Checking"); self.pause_button = QPushButton("Pause"); self.cancel_button = QPushButton("Cancel")
         proc_controls_layout.addWidget(self.check_button); proc_controls_layout.addWidget(self.pause_button); proc_controls_layout.addWidget(self.cancel_button)
         self.progress_bar = QProgressBar()
         details_header_layout = QHBoxLayout(); details_header_layout.addWidget(QLabel("Details:")); details_header_layout.addStretch()
         self.busy_indicator_label = QLabel(); self.copy_details_button = QPushButton("Copy Details"); self.repair_button = QPushButton("Repair...")
         self.repair_button.setToolTip("Open a dialog to generate and run an FFmpeg repair command (only for failed files)")
+        self.log_prev_button = QPushButton("◀"); self.log_next_button = QPushButton("▶"); self.log_page_label = QLabel()
+        for button in (self.log_prev_button, self.log_next_button): button.setFixedWidth(32); button.setVisible(False)
+        self.log_prev_button.setToolTip("Previous page of the FFmpeg log"); self.log_next_button.setToolTip("Next page of the FFmpeg log")
+        details_header_layout.addWidget(self.log_prev_button); details_header_layout.addWidget(self.log_page_label); details_header_layout.addWidget(self.log_next_button)
         details_header_layout.addWidget(self.repair_button); details_header_layout.addWidget(self.copy_details_button); details_header_layout.addWidget(self.busy_indicator_label)
         self.status_label = QLabel("Add files/folders or drag them onto the window to begin.")
-        self.details_log = QTextEdit(); self.details_log.setReadOnly(True)
+        self.details_log = QTextEdit(); self.details_log.setReadOnly(True); self.details_log.setAcceptRichText(False)
         self.gif_byte_array = QByteArray(base64.b64decode(LOADING_GIF_B64)); self.gif_buffer = QBuffer(self.gif_byte_array); self.gif_buffer.open(QIODevice.OpenModeFlag.ReadOnly)
         self.busy_movie = QMovie(self.gif_buffer, b'gif'); self.busy_indicator_label.setMovie(self.busy_movie); self.busy_indicator_label.setFixedSize(16, 16)
-        main_layout.addLayout(top_controls_layout); main_layout.addWidget(QLabel("Files to Process:")); main_layout.addWidget(self.file_list_widget)
+        list_header_layout = QHBoxLayout(); list_header_layout.addWidget(QLabel("Files to Process:")); list_header_layout.addStretch()
+        self.filter_edit = QLineEdit(); self.filter_edit.setClearButtonEnabled(True); self.filter_edit.setMinimumWidth(360)
+        self.filter_edit.setPlaceholderText("Filter, e.g. status:failed codec:hevc under:/archive since:7d name")
+        self.filter_edit.setToolTip(ResultQuery.__doc__.split('\n\n')[1].strip())
+        list_header_layout.addWidget(self.filter_edit)
+        self.filter_timer = QTimer(self); self.filter_timer.setSingleShot(True); self.filter_timer.setInterval(200); self.filter_timer.timeout.connect(self.apply_filter)
+        self.filter_edit.textChanged.connect(self.filter_timer.start)
+        main_layout.addLayout(top_controls_layout); main_layout.addLayout(list_header_layout); main_layout.addWidget(self.file_list_widget)
         main_layout.addLayout(proc_controls_layout); main_layout.addWidget(self.progress_bar); main_layout.addWidget(self.status_label)
         main_layout.addLayout(details_header_layout); main_layout.addWidget(self.details_log)
-        self.add_files_button.clicked.connect(self.add_files); self.add_folder_button.clicked.connect(self.add_folder)
+        self.move_progress_bar = QProgressBar(); self.move_progress_bar.setMaximum(1000); self.move_progress_bar.setTextVisible(False)
+        self.move_progress_bar.setMaximumWidth(200); self.move_progress_bar.setVisible(False)
+        self.cancel_move_button = QPushButton("Cancel Move"); self.cancel_move_button.setVisible(False); self.cancel_move_button.clicked.connect(self.cancel_move)
+        self.statusBar().addPermanentWidget(self.move_progress_bar); self.statusBar().addPermanentWidget(self.cancel_move_button)
+        self.add_files_button.clicked.connect(self.choose_files); self.add_folder_button.clicked.connect(self.add_folder)
         self.remove_selected_button.clicked.connect(self.remove_selected)
-        self.clear_button.clicked.connect(self.clear_list); self.file_list_widget.currentItemChanged.connect(self.update_details_log)
+        self.clear_button.clicked.connect(self.clear_list); self.file_list_widget.currentItemChanged.connect(lambda current, _: self.update_details_log(current))
+        self.log_prev_button.clicked.connect(lambda: self.update_details_log(page=self.details_page - 1))
+        self.log_next_button.clicked.connect(lambda: self.update_details_log(page=self.details_page + 1))
         self.check_button.clicked.connect(self.start_batch_check); self.pause_button.clicked.connect(self.toggle_pause)
-        self.cancel_button.clicked.connect(self.cancel_check); self.thread_spinbox.valueChanged.connect(self.thread_pool.setMaxThreadCount)
+        self.cancel_button.clicked.connect(self.cancel_check); self.thread_spinbox.valueChanged.connect(self.thread_pool.setMaxThreadCount); self.thread_spinbox.valueChanged.connect(lambda: self._dispatch())
         self.copy_details_button.clicked.connect(self.copy_details); self.repair_button.clicked.connect(self.generate_repair_command)
         self.fast_check_box.toggled.connect(self.fast_duration_spinbox.setEnabled)
     
     def _update_ui_for_state(self):
         # ... (UI State management is unchanged) ...
         is_idle = self.state == AppState.IDLE; is_running = self.state == AppState.RUNNING
-        is_paused = self.state == AppState.PAUSED; is_cancelling = self.state == AppState.CANCELLING; is_moving = self.state == AppState.MOVING
-        is_processing = not is_idle and not is_moving; has_items = len(self.jobs) > 0
+        is_paused = self.state == AppState.PAUSED; is_cancelling = self.state == AppState.CANCELLING; is_moving = self.transfer_worker is not None
+        is_processing = not is_idle; has_items = len(self.jobs) > 0
         has_completed = any(j.status in [JobStatus.OK, JobStatus.FAILED] for j in self.jobs)
         has_failed = any(j.status == JobStatus.FAILED for j in self.jobs)
-        self.centralWidget().setEnabled(not is_moving)
         self.add_files_button.setEnabled(is_idle); self.add_folder_button.setEnabled(is_idle)
         self.clear_button.setEnabled(is_idle and has_items); self.remove_selected_button.setEnabled(is_idle and has_items)
-        self.thread_spinbox.setEnabled(is_idle); self.fast_check_box.setEnabled(is_idle); self.fast_duration_spinbox.setEnabled(is_idle and self.fast_check_box.isChecked())
+        self.thread_spinbox.setEnabled(is_idle); self.fast_check_box.setEnabled(is_idle); self.incremental_box.setEnabled(is_idle and self.result_store is not None); self.profile_combo.setEnabled(is_idle); self.analyze_box.setEnabled(is_idle); self.checksum_combo.setEnabled(is_idle); self.fast_duration_spinbox.setEnabled(is_idle and self.fast_check_box.isChecked())
         self.file_list_widget.setEnabled(is_idle or is_paused)
         self.check_button.setVisible(is_idle); self.pause_button.setVisible(is_processing); self.cancel_button.setVisible(is_processing)
-        self.check_button.setEnabled(is_idle and has_items)
+        self.check_button.setEnabled(is_idle and has_items and self.ffmpeg_ready)
         self.pause_button.setText("Resume" if is_paused else "Pause")
-        self.pause_button.setEnabled(is_running or is_paused); self.cancel_button.setEnabled(not is_cancelling)
-        self.progress_bar.setVisible(is_processing); self.busy_indicator_label.setVisible(is_running)
-        if is_running: self.busy_movie.start() 
+        is_busy = is_running or self.state == AppState.REPAIRING
+        self.pause_button.setEnabled(is_running or is_paused); self.cancel_button.setEnabled(not is_cancelling and not self.repairs_cancelling)
+        self.progress_bar.setVisible(is_processing); self.busy_indicator_label.setVisible(is_busy)
+        if is_busy: self.busy_movie.start() 
         else: self.busy_movie.stop()
         self.menuBar().setEnabled(is_idle or is_paused)
         self.clear_verified_action.setEnabled((is_idle or is_paused) and has_completed)
-        self.move_corrupt_action.setEnabled((is_idle or is_paused) and has_failed)
-        self.retry_failed_action.setEnabled((is_idle or is_paused) and has_failed)
+        self.move_corrupt_action.setEnabled((is_idle or is_paused) and has_failed and not is_moving)
+        self.retry_failed_action.setEnabled((is_idle or is_paused) and has_failed and self.ffmpeg_ready and not is_moving)
+        self.repair_failed_action.setEnabled(is_idle and has_failed and self.ffmpeg_ready and not is_moving)
+        self.clear_button.setEnabled(is_idle and has_items and not is_moving); self.remove_selected_button.setEnabled(is_idle and has_items and not is_moving)
         self.update_details_log()
 
     ## NEW FEATURE: Method to show the About Dialog
@@ -321,14 +1782,17 @@ class VideoBatchCheckerApp(QMainWindow):
             if os.path.isdir(p):
                 files_to_process.extend([os.path.join(r, f) for r, _, fs in os.walk(p) for f in fs if f.lower().endswith(tuple(MEDIA_EXTENSIONS))])
         if files_to_process: self.add_files(sorted(files_to_process))
-    def add_files(self, files_to_add=None):
-        if not files_to_add: files_to_add, _ = QFileDialog.getOpenFileNames(self, "Select Video Files", "", f"Video Files (*{' *'.join(MEDIA_EXTENSIONS)});;All Files (*)")
+    def choose_files(self):
+        files, _ = QFileDialog.getOpenFileNames(self, "Select Video Files", "", f"Video Files (*{' *'.join(MEDIA_EXTENSIONS)});;All Files (*)")
+        if files: self.add_files(files)
+    def add_files(self, files_to_add, quiet=False):
+        if not files_to_add: return
         current_paths = {job.path for job in self.jobs}; duplicates = [f for f in files_to_add if f in current_paths]
         new_files = [f for f in files_to_add if f not in current_paths]
         for file in new_files:
             item = QListWidgetItem(f"🕒 {os.path.basename(file)}"); item.setToolTip(file)
-            self.file_list_widget.addItem(item); self.jobs.append(FileJob(file, item))
-        if duplicates:
+            self.file_list_widget.addItem(item); self.jobs.append(FileJob(file, item)); self.job_by_item[id(item)] = self.jobs[-1]
+        if duplicates and not quiet:
             duplicate_names = "\n".join(f"- {os.path.basename(f)}" for f in duplicates[:5])
             if len(duplicates) > 5: duplicate_names += "\n...and more."
             QMessageBox.warning(self, "Duplicates Skipped", f"Skipped {len(duplicates)} duplicate file(s) already in the queue:\n{duplicate_names}")
@@ -342,66 +1806,187 @@ class VideoBatchCheckerApp(QMainWindow):
         if not selected_items: return
         paths_to_remove = {job.path for job in self.jobs if job.list_widget_item in selected_items}
         self.jobs = [job for job in self.jobs if job.path not in paths_to_remove]
-        for item in selected_items: self.file_list_widget.takeItem(self.file_list_widget.row(item))
+        for item in selected_items: self.file_list_widget.takeItem(self.file_list_widget.row(item)); self.job_by_item.pop(id(item), None)
         self._update_ui_for_state()
     def clear_list(self):
         if self.state != AppState.IDLE: return
-        self.jobs.clear(); self.file_list_widget.clear(); self.status_label.setText("Add files/folders to begin."); self._update_ui_for_state()
+        self.jobs.clear(); self.job_by_item.clear(); self.file_list_widget.clear(); self.status_label.setText("Add files/folders to begin."); self._update_ui_for_state()
     def start_batch_check(self):
         if not self.jobs: return
         self.state = AppState.RUNNING; self.jobs_processed = 0; jobs_to_run_count = 0
         for job in self.jobs:
-            if job.status != JobStatus.OK:
-                job.status = JobStatus.QUEUED; job.details = "Queued..."
+            if job.status != JobStatus.OK and job.path not in self.moving_paths:
+                job.status = JobStatus.QUEUED; job.details = "Queued..."; job.timing = JobTiming()
                 job.list_widget_item.setText(f"🕒 {os.path.basename(job.path)}"); jobs_to_run_count += 1
-        self.progress_bar.setMaximum(jobs_to_run_count if jobs_to_run_count > 0 else 1)
+        if not jobs_to_run_count:
+            self.state = AppState.IDLE; self.status_label.setText("Nothing to check: files are verified or being moved."); self._update_ui_for_state(); return
+        self.metrics.job_enqueued(jobs_to_run_count)
+        self.progress_bar.setMaximum(jobs_to_run_count)
         self.progress_bar.setValue(0); self._update_ui_for_state(); self._submit_jobs()
-    def _submit_jobs(self):
-        if self.state != AppState.RUNNING: return
-        use_fast_check = self.fast_check_box.isChecked(); fast_duration = self.fast_duration_spinbox.value()
+    def _run_jobs(self, jobs, details="Queued..."):
+        """Queues the given jobs, starting a batch or extending the one in progress.
+
+        Files the transfer worker is moving are left out; their path changes when the move completes.
+        """
+        jobs = [job for job in jobs if job.path not in self.moving_paths]
+        if not jobs: return
+        for job in jobs:
+            job.status = JobStatus.QUEUED; job.details = details; job.timing = JobTiming()
+            job.list_widget_item.setText(f"🕒 {os.path.basename(job.path)}")
+        self.metrics.job_enqueued(len(jobs))
+        if self.state == AppState.IDLE:
+            self.state = AppState.RUNNING; self.jobs_processed = 0
+            self.progress_bar.setMaximum(len(jobs)); self.progress_bar.setValue(0)
+        else:
+            self.progress_bar.setMaximum(self.progress_bar.maximum() + len(jobs))
+        self._update_ui_for_state(); self._submit_jobs(jobs)
+    def _submit_jobs(self, jobs=None):
+        """Matches queued jobs against the check policy (once) and adds them to the dispatch queues.
+
+        Jobs queued while paused are added too; `_dispatch` starts them on resume.
+        """
+        if self.state not in [AppState.RUNNING, AppState.PAUSED]: return
+        policy = self._current_policy()
+        selected = None if jobs is None else {id(job) for job in jobs}
         for i, job in enumerate(self.jobs):
-            if job.status == JobStatus.QUEUED:
-                worker = RunnableFFmpegWorker(i, job.path, use_fast_check, fast_duration)
-                worker.signals.started.connect(self.on_file_started); worker.signals.finished.connect(self.on_file_finished)
-                self.thread_pool.start(worker)
+            if job.status == JobStatus.QUEUED and (selected is None or id(job) in selected) and i not in self.active_checks:
+                job.rule = policy.match(job.path) if policy else None
+                if job.rule: job.details += f" (policy rule: {job.rule.name})"
+                check_class = job.rule.check_class if job.rule else 'default'
+                self.dispatch_seq += 1
+                heapq.heappush(self.dispatch_queues.setdefault(check_class, []), (-(job.rule.priority if job.rule else 0), self.dispatch_seq, i))
+        self._dispatch()
+    def _dispatch(self):
+        """Starts queued checks while threads are free: highest priority first, within each class's concurrency limit."""
+        if self.state != AppState.RUNNING: return
+        limits = self.policy.classes if self.policy else {}
+        while len(self.active_checks) < self.thread_pool.maxThreadCount():
+            ready = [(queue[0], name) for name, queue in self.dispatch_queues.items()
+                     if queue and self.running_by_class.get(name, 0) < limits.get(name, sys.maxsize)]
+            if not ready: break
+            _, check_class = min(ready)
+            _, _, index = heapq.heappop(self.dispatch_queues[check_class])
+            if self.jobs[index].status != JobStatus.QUEUED or index in self.active_checks: continue
+            self.active_checks[index] = check_class; self.running_by_class[check_class] = self.running_by_class.get(check_class, 0) + 1
+            self._start_check(index)
+    def _start_check(self, index):
+        job = self.jobs[index]
+        incremental = self.incremental_box.isChecked() and self.result_store is not None
+        options = CheckOptions(self.fast_check_box.isChecked(), self.fast_duration_spinbox.value(), incremental,
+                               profile=self.profile_combo.currentData(), analyze=self.analyze_box.isChecked(), checksums=self.checksum_combo.currentData())
+        if job.rule: options = job.rule.apply(options)
+        if job.profile and not options.checksums: options = options.with_profile(job.profile)
+        baseline = self.result_store.fingerprint(job.path) if incremental and options.decodes_whole_file and not options.checksums else None
+        worker = RunnableFFmpegWorker(index, job.path, options, job.timing, baseline)
+        worker.signals.started.connect(self.on_file_started); worker.signals.finished.connect(self.on_file_finished)
+        self.thread_pool.start(worker)
     def toggle_pause(self):
-        if self.state == AppState.RUNNING: self.state = AppState.PAUSED; self.status_label.setText("Paused.")
-        elif self.state == AppState.PAUSED: self.state = AppState.RUNNING; self.status_label.setText("Resuming..."); self._submit_jobs()
+        if self.state == AppState.RUNNING: self.state = AppState.PAUSED; self.status_label.setText("Paused. Running checks will finish; no new ones start.")
+        elif self.state == AppState.PAUSED: self.state = AppState.RUNNING; self.status_label.setText("Resuming..."); self._dispatch()
         self._update_ui_for_state()
     def cancel_check(self):
+        if self.state == AppState.REPAIRING: self._cancel_repairs(); return
         if self.state in [AppState.RUNNING, AppState.PAUSED]:
-            self.state = AppState.CANCELLING; self.thread_pool.clear()
+            self.state = AppState.CANCELLING; self.dispatch_queues.clear()
             self.status_label.setText("Cancelling... Waiting for active checks to finish.")
             self._update_ui_for_state()
-            if self.thread_pool.activeThreadCount() == 0: self.on_batch_finished()
+            if not self.active_checks: self.on_batch_finished()
     def on_file_started(self, job_index):
+        self.metrics.job_started()
         if self.state == AppState.CANCELLING: return
         job = self.jobs[job_index]; job.status = JobStatus.RUNNING
         job.details = "Status: In Progress...\n\nResult: Checking file, please wait."
-        job.list_widget_item.setText(f"➡️ {os.path.basename(job.path)}"); self.update_details_log(job.list_widget_item)
-    def on_file_finished(self, job_index, is_success, details):
-        job = self.jobs[job_index]
-        if job.status == JobStatus.RUNNING: self.jobs_processed += 1
-        job.status = JobStatus.OK if is_success else JobStatus.FAILED
+        job.list_widget_item.setText(f"➡️ {os.path.basename(job.path)}")
+        if self.file_list_widget.currentItem() == job.list_widget_item: self.update_details_log()
+    def on_file_finished(self, job_index, is_success, details, result=None):
+        job = self.jobs[job_index]; job.timing.handled = time.monotonic()
+        check_class = self.active_checks.pop(job_index, None)
+        if check_class is not None: self.running_by_class[check_class] -= 1
+        job.result = result or CheckResult(job.path, 'OK' if is_success else 'FAILED', error_count=0 if is_success else 1, error_classes=[] if is_success else ['other'])
+        job.log, job.result_id = (None if is_success else details), None
+        if self.result_store:
+            try:
+                job.result_id = self.result_store.record(job.result, details if not is_success else "", self.session_id)
+                job.log = None
+                if job.result.fingerprint: self.result_store.save_fingerprint(job.path, job.result.fingerprint)
+            except sqlite3.Error as e: self.status_label.setText(f"Could not record result: {e}")
+        self.metrics.job_finished(job.timing, is_success, was_started=job.timing.started is not None)
+        if job.status in [JobStatus.RUNNING, JobStatus.QUEUED]: self.jobs_processed += 1  # QUEUED: failed before starting
+        job.status = JobStatus.OK if is_success else JobStatus.FAILED; job.checked_at = time.time()
         icon = "✅" if is_success else "❌"; job.list_widget_item.setText(f"{os.path.basename(job.path)} {icon}")
         job.details = f"Status: {job.status.name} {icon}\n\n"
-        if is_success: job.details += "Result: File integrity verified."
-        else: job.details += f"Result: File may be corrupt.\n\nFFmpeg Details:\n------------------\n{details}"
+        if is_success: job.details += "Result: File integrity verified." + (f"\n\n{details}" if details != "OK" else "")
+        else:
+            job.details += "Result: File may be corrupt."
+            job.details += f"\nErrors: {job.result.error_count} line(s) ({', '.join(job.result.error_classes) or 'unclassified'})"
+            if job.result.first_error_time is not None: job.details += f"\nFirst error at: {job.result.first_error_time:.1f}s"
+            job.details += f"\nCheck mode: {job.result.check_mode}"
         if self.file_list_widget.currentItem() == job.list_widget_item: self.update_details_log()
         self.progress_bar.setValue(self.jobs_processed)
         self.status_label.setText(f"Processed {self.jobs_processed}/{self.progress_bar.maximum()} files...")
         jobs_to_run_count = self.progress_bar.maximum()
-        if self.jobs_processed >= jobs_to_run_count or (self.state == AppState.CANCELLING and self.thread_pool.activeThreadCount() == 0):
+        if self.jobs_processed >= jobs_to_run_count or (self.state == AppState.CANCELLING and not self.active_checks):
             self.on_batch_finished()
+        else: self._dispatch()
     def on_batch_finished(self):
         if self.state == AppState.CANCELLING:
             self.status_label.setText("Batch processing cancelled.")
             for job in self.jobs:
                 if job.status == JobStatus.QUEUED: job.status = JobStatus.CANCELLED
+        elif self.folder_watcher.is_active() or self.schedule:
+            self.status_label.setText("Batch processing complete. Watching for new files...")
         else:
             self.status_label.setText("Batch processing complete."); self._show_summary_dialog()
         if self.progress_bar.maximum() > 0: self.progress_bar.setValue(self.progress_bar.maximum())
-        self.state = AppState.IDLE; self._update_ui_for_state()
+        if self.result_store: self.result_store.commit()
+        self.dispatch_queues.clear(); self.active_checks.clear(); self.running_by_class.clear()
+        self.state = AppState.IDLE; self.metrics.reset_queue(); self._update_ui_for_state()
+        self._flush_pending_watch_paths()
+    def show_file_context_menu(self, pos):
+        items = self.file_list_widget.selectedItems()
+        if not items: return
+        jobs = [self.job_by_item[id(item)] for item in items if id(item) in self.job_by_item]
+        menu = QMenu(self); profile_menu = menu.addMenu("Check Profile")
+        default_action = profile_menu.addAction("Use Global Setting"); default_action.setData(None)
+        profile_menu.addSeparator()
+        for key, (label, _, _, coverage) in CHECK_PROFILES.items():
+            action = profile_menu.addAction(label); action.setData(key); action.setToolTip(coverage)
+        profile_menu.setToolTipsVisible(True)
+        for action in profile_menu.actions():
+            action.setCheckable(not action.isSeparator()); action.setChecked(not action.isSeparator() and all(job.profile == action.data() for job in jobs))
+        profile_menu.setEnabled(self.state == AppState.IDLE)
+        chosen = menu.exec(self.file_list_widget.mapToGlobal(pos))
+        if chosen is None or chosen.menu() is not None or chosen not in profile_menu.actions(): return
+        for job in jobs:
+            job.profile = chosen.data()
+            self._update_job_tooltip(job)
+    def _update_job_tooltip(self, job):
+        job.list_widget_item.setToolTip(job.path + (f"\nCheck profile: {CHECK_PROFILES[job.profile][0]}" if job.profile else ""))
+    def apply_filter(self):
+        try: query = ResultQuery(self.filter_edit.text())
+        except ValueError: self.filter_edit.setStyleSheet("color: #c0392b;"); return
+        self.filter_edit.setStyleSheet("")
+        self.file_list_widget.setUpdatesEnabled(False)
+        for job in self.jobs:
+            job.list_widget_item.setHidden(not query.is_empty() and not query.matches(job.path, job.status.name, job.result, job.checked_at))
+        self.file_list_widget.setUpdatesEnabled(True)
+    def load_from_history(self):
+        if self.state != AppState.IDLE or not self.result_store: return
+        text, ok = QInputDialog.getText(self, "Load From History", "Load the latest result of every file matching:\n" + ResultQuery.__doc__.split('\n\n')[1].strip(), text=self.filter_edit.text())
+        if not ok: return
+        try: found = [(result, result_id) for result, result_id in self.result_store.query(ResultQuery(text)) if os.path.exists(result.path)]
+        except ValueError as e: QMessageBox.warning(self, "Invalid Query", str(e)); return
+        if not found: QMessageBox.information(self, "Load From History", "No existing files match this query."); return
+        self.add_files([r.path for r, _ in found], quiet=True)
+        by_path = {job.path: job for job in self.jobs}
+        for result, result_id in found:
+            job = by_path.get(result.path)
+            if not job or job.status != JobStatus.QUEUED: continue
+            job.status = JobStatus[result.status]; job.result = result; job.checked_at = result.checked_at; job.result_id = result_id
+            icon = "✅" if job.status == JobStatus.OK else "❌"
+            job.details = f"Status: {job.status.name} {icon}\n\nResult: Loaded from history (checked {datetime.fromtimestamp(result.checked_at):%Y-%m-%d %H:%M})."
+            job.list_widget_item.setText(f"{os.path.basename(job.path)} {icon}")
+        self.status_label.setText(f"Loaded {len(found)} file(s) from history."); self._update_ui_for_state()
     def _show_summary_dialog(self):
         counts = {status: 0 for status in JobStatus};
         for job in self.jobs: counts[job.status] += 1
@@ -414,22 +1999,111 @@ class VideoBatchCheckerApp(QMainWindow):
             copy_button = dialog.addButton("Copy Failed List", QMessageBox.ButtonRole.ActionRole)
             copy_button.clicked.connect(lambda: QGuiApplication.clipboard().setText('\n'.join(failed_files)))
         dialog.exec()
-    def update_details_log(self, current_item=None):
+    def _job_log(self, job):
+        """Returns the raw ffmpeg output of a failed job, reading it from the result index if needed."""
+        if job.log is not None: return job.log
+        if job.result_id is not None and self.result_store:
+            try: return self.result_store.details(job.result_id) or ""
+            except sqlite3.Error: pass
+        return ""
+    def _job_log_lines(self, job):
+        key = (job, job.result_id, job.log is None)
+        if self.log_cache[0] != key: self.log_cache = (key, self._job_log(job).splitlines() if job.status == JobStatus.FAILED else [])
+        return self.log_cache[1]
+    def update_details_log(self, current_item=None, page=None):
+        """Shows the selected job's summary and one page of its ffmpeg log; does nothing if that is already shown."""
         if current_item is None: current_item = self.file_list_widget.currentItem()
-        if not current_item:
-            self.details_log.clear(); self.copy_details_button.setEnabled(False); self.repair_button.setVisible(False); return
-        job = next((j for j in self.jobs if j.list_widget_item == current_item), None)
-        if job:
-            self.details_log.setText(f"Full Path: {job.path}\n\n{job.details}"); self.copy_details_button.setEnabled(True)
-            self.repair_button.setVisible(job.status == JobStatus.FAILED)
-    def copy_details(self): QGuiApplication.clipboard().setText(self.details_log.toPlainText())
+        job = self.job_by_item.get(id(current_item)) if current_item else None
+        if not job:
+            self.details_shown = None; self.details_log.clear(); self.copy_details_button.setEnabled(False); self.repair_button.setVisible(False)
+            self.log_prev_button.setVisible(False); self.log_next_button.setVisible(False); self.log_page_label.clear(); return
+        if page is None: page = self.details_page if self.details_shown and self.details_shown[0] is job else 0
+        lines = self._job_log_lines(job); pages = max(1, -(-len(lines) // DETAILS_PAGE_LINES)); page = min(max(0, page), pages - 1)
+        shown = (job, job.details, job.result_id, page)
+        if shown == self.details_shown: return
+        self.details_shown = shown; self.details_page = page
+        text = f"Full Path: {job.path}\n\n{job.details}"
+        if lines:
+            first = page * DETAILS_PAGE_LINES
+            text += "\n\nFFmpeg Details:\n------------------\n" + "\n".join(lines[first:first + DETAILS_PAGE_LINES])
+        self.details_log.setPlainText(text); self.copy_details_button.setEnabled(True)
+        self.repair_button.setVisible(job.status == JobStatus.FAILED)
+        self.log_prev_button.setVisible(pages > 1); self.log_next_button.setVisible(pages > 1)
+        self.log_prev_button.setEnabled(page > 0); self.log_next_button.setEnabled(page < pages - 1)
+        self.log_page_label.setText(f"Log lines {page * DETAILS_PAGE_LINES + 1}-{min(len(lines), (page + 1) * DETAILS_PAGE_LINES)} of {len(lines)}" if pages > 1 else "")
+    def copy_details(self):
+        job = self.job_by_item.get(id(self.file_list_widget.currentItem()))
+        if not job: return
+        log = self._job_log(job) if job.status == JobStatus.FAILED else ""
+        QGuiApplication.clipboard().setText(f"Full Path: {job.path}\n\n{job.details}" + (f"\n\nFFmpeg Details:\n------------------\n{log}" if log else ""))
     def generate_repair_command(self):
-        job = next((j for j in self.jobs if j.list_widget_item == self.file_list_widget.currentItem()), None)
-        if job and job.status == JobStatus.FAILED: dialog = RepairCommandDialog(job.path, self); dialog.exec()
+        selected_failed = [j for j in self.jobs if j.list_widget_item.isSelected() and j.status == JobStatus.FAILED]
+        if len(selected_failed) > 1: self.repair_failed(); return
+        job = self.job_by_item.get(id(self.file_list_widget.currentItem()))
+        if job and job.status == JobStatus.FAILED:
+            dialog = RepairCommandDialog(job.path, self)
+            if dialog.exec() == RepairCommandDialog.RUN_REPAIR and self.state == AppState.IDLE:
+                self.start_repairs([(job, dialog.output_file_edit.text())], dialog.strategy(), reverify=True)
+    def repair_failed(self):
+        failed = [j for j in self.jobs if j.status == JobStatus.FAILED]
+        selected = [j for j in failed if j.list_widget_item.isSelected()]
+        jobs = selected or failed
+        if not jobs: QMessageBox.information(self, "No Failed Files", "There are no failed files to repair."); return
+        dialog = BatchRepairDialog(jobs, self)
+        if not dialog.exec(): return
+        taken = set(); targets = []
+        for job in jobs:
+            out_file = repair_output_path(job.path, dialog.suffix(), taken); taken.add(out_file); targets.append((job, out_file))
+        self.start_repairs(targets, dialog.strategy(), dialog.reverify_box.isChecked())
+    def start_repairs(self, targets, strategy, reverify=True):
+        """Runs repairs for (job, output path) pairs on the shared thread pool."""
+        if self.state != AppState.IDLE or not targets: return
+        self.state = AppState.REPAIRING; self.repairs_done = 0; self.repairs_cancelling = False; self.reverify_repairs = reverify
+        self.repairs = []
+        for index, (job, out_file) in enumerate(targets):
+            worker = RunnableRepairWorker(index, job.path, out_file, strategy)
+            worker.signals.started.connect(self._on_repair_started); worker.signals.progress.connect(self._on_repair_progress)
+            worker.signals.finished.connect(self._on_repair_finished)
+            self.repairs.append({'job': job, 'out_file': out_file, 'worker': worker, 'fraction': 0.0, 'ok': False})
+        self.progress_bar.setMaximum(len(targets) * 100); self.progress_bar.setValue(0)
+        self.status_label.setText(f"Repairing {len(targets)} file(s) ({REPAIR_STRATEGIES[strategy][0]})...")
+        self._update_ui_for_state()
+        for repair in self.repairs: self.thread_pool.start(repair['worker'])
+    def _on_repair_started(self, index):
+        job = self.repairs[index]['job']; job.list_widget_item.setText(f"🔧 {os.path.basename(job.path)}")
+    def _on_repair_progress(self, index, fraction):
+        self.repairs[index]['fraction'] = fraction
+        self.progress_bar.setValue(int(sum(r['fraction'] for r in self.repairs) * 100))
+    def _on_repair_finished(self, index, is_success, details):
+        repair = self.repairs[index]; job = repair['job']; repair['ok'] = is_success; repair['fraction'] = 1.0
+        self.repairs_done += 1
+        job.list_widget_item.setText(f"{os.path.basename(job.path)} ❌")
+        if is_success: job.details += f"\n\nREPAIRED to {repair['out_file']}"
+        else: job.details += f"\n\nRepair failed: {details}"
+        if self.file_list_widget.currentItem() == job.list_widget_item: self.update_details_log()
+        self.progress_bar.setValue(int(sum(r['fraction'] for r in self.repairs) * 100))
+        self.status_label.setText(f"Repaired {self.repairs_done}/{len(self.repairs)} files...")
+        if self.repairs_done >= len(self.repairs): self._on_repairs_finished()
+    def _cancel_repairs(self):
+        self.repairs_cancelling = True; self.status_label.setText("Cancelling repairs...")
+        for repair in self.repairs: repair['worker'].cancel()
+        self._update_ui_for_state()
+    def _on_repairs_finished(self):
+        repaired = [r['out_file'] for r in self.repairs if r['ok'] and os.path.exists(r['out_file'])]
+        failed = len(self.repairs) - len(repaired); was_cancelled = self.repairs_cancelling
+        self.repairs = []; self.repairs_cancelling = False
+        self.state = AppState.IDLE; self._update_ui_for_state()
+        self.status_label.setText(f"Repair {'cancelled' if was_cancelled else 'complete'}: {len(repaired)} repaired, {failed} failed.")
+        if repaired and self.reverify_repairs and not was_cancelled:
+            self.add_files(repaired, quiet=True)
+            by_path = {job.path: job for job in self.jobs}
+            self._run_jobs([by_path[p] for p in repaired if p in by_path], "Queued for verification after repair...")
+        self._flush_pending_watch_paths()
     def save_queue(self):
         path, _ = QFileDialog.getSaveFileName(self, "Save Queue", "", "JSON Queue File (*.json)")
         if path:
-            queue_data = [{'path': j.path, 'status': j.status.name, 'details': j.details} for j in self.jobs]
+            queue_data = [{'path': j.path, 'status': j.status.name, 'details': j.details, 'log': self._job_log(j) or None, 'checked_at': j.checked_at,
+                           'result': j.result.to_row() if j.result else None} for j in self.jobs]
             try:
                 with open(path, 'w', encoding='utf-8') as f: json.dump(queue_data, f, indent=2)
             except Exception as e: QMessageBox.critical(self, "Error", f"Could not save queue: {e}")
@@ -447,6 +2121,8 @@ class VideoBatchCheckerApp(QMainWindow):
                     if job.path in files_to_load:
                         item_data = files_to_load[job.path]
                         job.status = JobStatus[item_data.get('status', 'QUEUED')]; job.details = item_data.get('details', 'Queued...')
+                        job.checked_at = item_data.get('checked_at'); job.log = item_data.get('log')
+                        if item_data.get('result'): job.result = CheckResult.from_row(item_data['result'])
                         icon = "✅" if job.status == JobStatus.OK else "❌" if job.status == JobStatus.FAILED else "🕒"
                         job.list_widget_item.setText(f"{icon} {os.path.basename(job.path)}")
             else:
@@ -456,58 +2132,550 @@ class VideoBatchCheckerApp(QMainWindow):
         except Exception as e: QMessageBox.critical(self, "Error", f"Could not load queue: {e}")
         self._update_ui_for_state()
     def export_results(self):
-        path, _ = QFileDialog.getSaveFileName(self, "Export Results", "", "CSV Files (*.csv)")
+        path, selected_filter = QFileDialog.getSaveFileName(self, "Export Results", "", ";;".join(EXPORT_FORMATS))
         if path:
+            fmt, ext = EXPORT_FORMATS.get(selected_filter, ('csv', '.csv'))
+            if not path.lower().endswith(ext): path += ext
             try:
-                with open(path, 'w', newline='', encoding='utf-8') as f:
-                    writer = csv.writer(f); writer.writerow(["File Path", "Status", "Details"])
-                    for job in self.jobs: writer.writerow([job.path, job.status.name, job.details.replace('\n', ' | ')])
+                if fmt == 'csv':
+                    with open(path, 'w', newline='', encoding='utf-8') as f:
+                        writer = csv.writer(f); writer.writerow(["File Path", "Status", "Details"])
+                        for job in self.jobs:
+                            log = self._job_log(job) if job.status == JobStatus.FAILED else ""
+                            writer.writerow([job.path, job.status.name, (job.details + (f"\n\nFFmpeg Details:\n{log}" if log else "")).replace('\n', ' | ')])
+                else:
+                    # Jobs never checked keep checked_at empty; CheckResult would stamp them with the current time.
+                    rows = (job.result.to_row() if job.result else dict(CheckResult(job.path, job.status.name).to_row(), checked_at=job.checked_at) for job in self.jobs)
+                    export_result_rows(path, rows, fmt)
             except Exception as e: QMessageBox.critical(self, "Error", f"Could not export results: {e}")
     def clear_verified(self):
         for i in range(len(self.jobs) - 1, -1, -1):
-            if self.jobs[i].status == JobStatus.OK: self.file_list_widget.takeItem(i); del self.jobs[i]
+            if self.jobs[i].status == JobStatus.OK: self.job_by_item.pop(id(self.file_list_widget.takeItem(i)), None); del self.jobs[i]
         self._update_ui_for_state()
     def move_corrupt_files(self):
-        dest_folder = QFileDialog.getExistingDirectory(self, "Select Destination for Corrupt Files")
-        if not dest_folder: return
+        if self.transfer_worker: return
         failed_jobs = [j for j in self.jobs if j.status == JobStatus.FAILED]
         if not failed_jobs: QMessageBox.information(self, "No Files to Move", "No corrupt files found."); return
-        self.state = AppState.MOVING
-        self.status_label.setText(f"Moving {len(failed_jobs)} files...")
-        self._update_ui_for_state()
-        worker = RunnableMoveWorker(failed_jobs, dest_folder)
+        dialog = MoveDialog(len(failed_jobs), self.settings, self)
+        if not dialog.exec(): return
+        dialog.save(self.settings)
+        self.moving_paths = {j.path for j in failed_jobs}
+        worker = RunnableTransferWorker([j.path for j in failed_jobs], dialog.dest_edit.text(), dialog.parallel_spinbox.value(), dialog.verify_box.isChecked())
         worker.signals.file_moved.connect(self._update_moved_job_path)
+        worker.signals.progress.connect(self._on_move_progress)
         worker.signals.finished.connect(self._on_move_finished)
-        self.thread_pool.start(worker)
+        self.transfer_worker = worker
+        self.move_progress_bar.setValue(0); self.move_progress_bar.setVisible(True); self.cancel_move_button.setVisible(True)
+        self.statusBar().showMessage(f"Moving {len(failed_jobs)} files...")
+        self._update_ui_for_state()
+        self.transfer_pool.start(worker)
+    def _on_move_progress(self, done, total):
+        self.move_progress_bar.setValue(int(1000 * done / total) if total else 1000)
+        self.statusBar().showMessage(f"Moving corrupt files: {done / 1024 ** 3:.2f} / {total / 1024 ** 3:.2f} GB")
+    def cancel_move(self):
+        if self.transfer_worker: self.transfer_worker.cancel(); self.statusBar().showMessage("Cancelling move...")
     def _update_moved_job_path(self, old_path, new_path):
         job = next((j for j in self.jobs if j.path == old_path), None)
         if job:
             job.path = new_path; job.details += f"\n\nMOVED to {new_path}"
-            job.list_widget_item.setToolTip(new_path)
+            self._update_job_tooltip(job)
     def _on_move_finished(self, summary_message):
-        QMessageBox.information(self, "Move Complete", summary_message)
-        self.state = AppState.IDLE
-        self.status_label.setText("Move operation finished.")
+        self.transfer_worker = None; self.moving_paths = set()
+        self.move_progress_bar.setVisible(False); self.cancel_move_button.setVisible(False)
+        self.statusBar().showMessage("Move operation finished.", 10000)
         self._update_ui_for_state()
+        QMessageBox.information(self, "Move Complete", summary_message)
     def retry_failed(self):
         failed_jobs_to_retry = [j for j in self.jobs if j.status == JobStatus.FAILED]
         if not failed_jobs_to_retry: QMessageBox.information(self, "No Failed Files", "There are no failed files to retry."); return
-        self.state = AppState.RUNNING; self.jobs_processed = 0
-        self.progress_bar.setMaximum(len(failed_jobs_to_retry)); self.progress_bar.setValue(0)
-        for job in failed_jobs_to_retry:
-            job.status = JobStatus.QUEUED; job.details = "Queued for retry..."
-            job.list_widget_item.setText(f"🕒 {os.path.basename(job.path)}")
-        self._update_ui_for_state(); self._submit_jobs()
+        self._run_jobs(failed_jobs_to_retry, "Queued for retry...")
+    def configure_watch_folders(self):
+        dialog = WatchFolderDialog(self.settings, self)
+        if dialog.exec(): dialog.save(self.settings); self._apply_watch_settings()
+    def _apply_watch_settings(self):
+        if self.settings.value("watch/enabled", False, type=bool):
+            self.folder_watcher.start(self.settings.value("watch/folders", [], type=list),
+                                      self.settings.value("watch/stable_seconds", 10, type=int), self.settings.value("watch/poll_seconds", 60, type=int))
+        else: self.folder_watcher.stop()
+        cron = self.settings.value("schedule/cron", "", type=str)
+        try: self.schedule = CronSchedule(cron) if cron else None
+        except ValueError: self.schedule = None
+        if self.schedule: self.schedule_timer.start()
+        else: self.schedule_timer.stop()
+        if self.state == AppState.IDLE and (self.folder_watcher.is_active() or self.schedule):
+            self.status_label.setText(f"Watching {len(self.folder_watcher.folders)} folder(s)." + (f" Re-verify schedule: {self.schedule.expression}" if self.schedule else ""))
+    def _flush_pending_watch_paths(self):
+        """Queues watch-folder arrivals and scheduled re-checks that were held back while the app was busy."""
+        if self.pending_watch_paths:
+            paths, self.pending_watch_paths = self.pending_watch_paths, []
+            self._enqueue_watched_files(paths)
+    def _enqueue_watched_files(self, paths):
+        if self.state not in [AppState.IDLE, AppState.RUNNING, AppState.PAUSED]:
+            self.pending_watch_paths.extend(paths); return
+        known = {job.path: job for job in self.jobs}
+        new_paths = [p for p in paths if p not in known]
+        if new_paths: self.add_files(new_paths, quiet=True)
+        by_path = {job.path: job for job in self.jobs}
+        busy = [JobStatus.RUNNING] if self.state == AppState.IDLE else [JobStatus.RUNNING, JobStatus.QUEUED]
+        self._run_jobs([by_path[p] for p in paths if p in by_path and by_path[p].status not in busy], "Queued (watch folder)...")
+    def configure_policy(self):
+        dialog = PolicyDialog(self.settings, self)
+        if dialog.exec(): dialog.save(self.settings); self._load_policy(interactive=True)
+    def _load_policy(self, interactive=False):
+        path = self.settings.value("policy/path", "", type=str)
+        self.policy = None; self.policy_mtime = None; set_media_extensions()
+        if not path: return
+        try:
+            self.policy_mtime = os.path.getmtime(path); self.policy = CheckPolicy.load(path)
+            set_media_extensions(self.policy.extensions)
+            if interactive: self.status_label.setText(f"Loaded check policy with {len(self.policy.rules)} rule(s) from {os.path.basename(path)}.")
+        except POLICY_ERRORS as e:
+            self.status_label.setText(f"Check policy not loaded: {e}")
+            if interactive: QMessageBox.warning(self, "Check Policy", f"Could not load {path}:\n{e}")
+    def _current_policy(self):
+        """Returns the check policy, reloading it first if the file changed since it was read."""
+        path = self.settings.value("policy/path", "", type=str)
+        if path:
+            try: mtime = os.path.getmtime(path)
+            except OSError: mtime = None
+            if mtime != self.policy_mtime: self._load_policy()
+        return self.policy
+    def configure_metrics(self):
+        dialog = MetricsDialog(self.settings, self)
+        if dialog.exec(): dialog.save(self.settings); self._apply_metrics_settings()
+    def _apply_metrics_settings(self):
+        if self.metrics_server: self.metrics_server.stop(); self.metrics_server = None
+        if self.settings.value("metrics/http_enabled", False, type=bool):
+            port = self.settings.value("metrics/port", 9464, type=int)
+            try: self.metrics_server = MetricsServer(self.metrics, port); self.metrics_server.start()
+            except OSError as e: QMessageBox.warning(self, "Metrics Endpoint", f"Could not listen on port {port}: {e}")
+        if self.settings.value("metrics/json_path", "", type=str):
+            self.metrics_dump_timer.start(self.settings.value("metrics/json_interval", 30, type=int) * 1000)
+        else: self.metrics_dump_timer.stop()
+    def _dump_metrics(self):
+        path = self.settings.value("metrics/json_path", "", type=str)
+        if not path: return
+        try:
+            with open(path + '.tmp', 'w', encoding='utf-8') as f: json.dump(dict(self.metrics.snapshot(), timestamp=time.time()), f, indent=2)
+            os.replace(path + '.tmp', path)
+        except OSError as e: self.metrics_dump_timer.stop(); self.status_label.setText(f"Metrics dump disabled: {e}")
+    def _check_schedule(self):
+        now = datetime.now().replace(second=0, microsecond=0)
+        if not self.schedule or now == self.last_schedule_run or not self.schedule.matches(now): return
+        self.last_schedule_run = now
+        cutoff = time.time() - self.settings.value("schedule/max_age_hours", 24 * 7, type=int) * 3600
+        aged = [j for j in self.jobs if j.status in [JobStatus.OK, JobStatus.FAILED] and (j.checked_at or 0) < cutoff
+                and j.path not in self.moving_paths and os.path.exists(j.path)]
+        if not aged: return
+        if self.state in [AppState.IDLE, AppState.RUNNING, AppState.PAUSED]: self._run_jobs(aged, "Queued (scheduled re-verification)...")
+        else: self.pending_watch_paths.extend(j.path for j in aged)
     def closeEvent(self, event):
-        if self.state not in [AppState.IDLE, AppState.MOVING]:
-            reply = QMessageBox.question(self, 'Exit Confirmation', "A batch process is running. Are you sure you want to exit?", QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.No)
+        if self.state != AppState.IDLE or self.transfer_worker:
+            reply = QMessageBox.question(self, 'Exit Confirmation', "A batch process or move is running. Are you sure you want to exit?", QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.No)
             if reply == QMessageBox.StandardButton.No: event.ignore(); return
         self.busy_movie.stop(); self.gif_buffer.close()
-        self.thread_pool.clear(); self.thread_pool.waitForDone(-1)
+        if self.metrics_server: self.metrics_server.stop()
+        for repair in self.repairs: repair['worker'].cancel()
+        if self.transfer_worker: self.transfer_worker.cancel()
+        self.thread_pool.clear(); self.thread_pool.waitForDone(-1); self.transfer_pool.waitForDone(-1)
+        if self.result_store: self.result_store.close(); self.result_store = None
         super().closeEvent(event)
 
+# --- Result Export ---
+EXPORT_BATCH_ROWS = 10000
+EXPORT_FORMATS = {
+    # file dialog filter: (format name, default extension)
+    "CSV Files (*.csv)": ('csv', '.csv'),
+    "Compressed JSON Lines (*.jsonl.gz)": ('jsonl.gz', '.jsonl.gz'),
+    "Parquet Files (*.parquet)": ('parquet', '.parquet'),
+    "Arrow IPC Files (*.arrow)": ('arrow', '.arrow'),
+}
+
+def export_schema():
+    return pyarrow.schema([
+        ('path', pyarrow.string()), ('size', pyarrow.int64()), ('duration', pyarrow.float64()), ('codec', pyarrow.string()),
+        ('status', pyarrow.string()), ('error_count', pyarrow.int32()), ('error_classes', pyarrow.list_(pyarrow.string())),
+        ('first_error_time', pyarrow.float64()), ('check_mode', pyarrow.string()), ('elapsed_seconds', pyarrow.float64()),
+        ('throughput_mb_s', pyarrow.float64()), ('checked_at', pyarrow.timestamp('s', tz='UTC')),
+    ])
+
+def export_result_rows(path, rows, fmt):
+    """Streams result rows (dicts with CheckResult.FIELDS) to a typed columnar or JSON Lines file.
+
+    Rows are written in batches, so memory use does not grow with the number of results.
+    Returns the number of rows written.
+    """
+    count = 0
+    if fmt == 'jsonl.gz':
+        with gzip.open(path, 'wt', encoding='utf-8', compresslevel=6) as f:
+            for row in rows: f.write(json.dumps(row, separators=(',', ':')) + '\n'); count += 1
+        return count
+    if pyarrow is None: raise RuntimeError("Parquet/Arrow export requires the 'pyarrow' package (pip install pyarrow).")
+    schema = export_schema()
+    writer = pyarrow.parquet.ParquetWriter(path, schema, compression='zstd') if fmt == 'parquet' else pyarrow.ipc.new_file(path, schema)
+    def flush(batch):
+        columns = {name: [row.get(name) for row in batch] for name in schema.names}
+        columns['checked_at'] = [int(t) if t is not None else None for t in columns['checked_at']]
+        writer.write_table(pyarrow.Table.from_pydict(columns, schema=schema))
+    try:
+        batch = []
+        for row in rows:
+            batch.append(row); count += 1
+            if len(batch) >= EXPORT_BATCH_ROWS: flush(batch); batch = []
+        if batch or count == 0: flush(batch)
+    finally: writer.close()
+    return count
+
+# --- Result Index ---
+def parse_time_spec(spec, now=None):
+    """Parses '30d', '12h', '2w', '3m', 'today', 'yesterday', 'lastweek', 'lastmonth' or an ISO date into epoch seconds."""
+    now = now or datetime.now(); spec = spec.strip().lower()
+    named = {'today': now.replace(hour=0, minute=0, second=0, microsecond=0)}
+    named['yesterday'] = named['today'] - timedelta(days=1)
+    named['lastweek'] = named['today'] - timedelta(days=7); named['lastmonth'] = named['today'] - timedelta(days=30)
+    if spec in named: return named[spec].timestamp()
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)([hdwm])', spec)
+    if match:
+        hours = float(match.group(1)) * {'h': 1, 'd': 24, 'w': 24 * 7, 'm': 24 * 30}[match.group(2)]
+        return (now - timedelta(hours=hours)).timestamp()
+    return datetime.fromisoformat(spec).timestamp()
+
+class ResultQuery:
+    """A filter such as 'codec:hevc under:/archive/2019 status:failed since:lastmonth'.
+
+    Supported terms: status:, codec:, under: (or dir:), ext:, error: (error class), mode:, since:, before:;
+    any other word must appear in the file path. The same query runs in memory for the filter bar and as SQL against the index.
+    """
+    KEYS = {'status', 'codec', 'under', 'dir', 'ext', 'error', 'mode', 'since', 'before'}
+
+    def __init__(self, text=""):
+        self.text = text; self.terms = {}; self.words = []
+        try: tokens = shlex.split(text)
+        except ValueError: tokens = text.split()
+        for token in tokens:
+            key, sep, value = token.partition(':')
+            if sep and key.lower() in self.KEYS and value:
+                key = 'under' if key.lower() == 'dir' else key.lower()
+                if key in ('since', 'before'): value = parse_time_spec(value)
+                elif key == 'under': value = os.path.normpath(value)
+                else: value = value.lower()
+                self.terms.setdefault(key, []).append(value)
+            else: self.words.append(token.lower())
+
+    def is_empty(self): return not self.terms and not self.words
+
+    @staticmethod
+    def _under(path, folder):
+        return path == folder or path.startswith(folder.rstrip(os.sep) + os.sep)
+
+    def matches(self, path, status, result=None, checked_at=None):
+        t = self.terms; lower_path = path.lower()
+        if any(word not in lower_path for word in self.words): return False
+        if 'status' in t and status.lower() not in t['status']: return False
+        if 'ext' in t and os.path.splitext(lower_path)[1].lstrip('.') not in [e.lstrip('.') for e in t['ext']]: return False
+        if 'under' in t and not any(self._under(os.path.normpath(path), folder) for folder in t['under']): return False
+        if 'codec' in t and (result is None or (result.codec or '').lower() not in t['codec']): return False
+        if 'mode' in t and (result is None or result.check_mode not in t['mode']): return False
+        if 'error' in t and (result is None or not set(t['error']) & set(result.error_classes)): return False
+        if 'since' in t and (checked_at is None or checked_at < max(t['since'])): return False
+        if 'before' in t and (checked_at is None or checked_at >= min(t['before'])): return False
+        return True
+
+    def to_sql(self):
+        """Returns (where clause, parameters) over the results table aliased as r."""
+        clauses, params = ['r.latest = 1'], []
+        def any_of(column, values):
+            clauses.append('(' + ' OR '.join(f'{column} = ?' for _ in values) + ')'); params.extend(values)
+        t = self.terms
+        if 'status' in t: any_of('r.status', [v.upper() for v in t['status']])
+        if 'codec' in t: any_of('r.codec', t['codec'])
+        if 'mode' in t: any_of('r.check_mode', t['mode'])
+        if 'ext' in t: any_of('r.extension', ['.' + e.lstrip('.') for e in t['ext']])
+        if 'under' in t:
+            # Range comparisons (not LIKE) so the directory index is used.
+            parts = []
+            for folder in t['under']:
+                prefix = folder.rstrip(os.sep) + os.sep
+                parts.append('(r.directory = ? OR (r.directory >= ? AND r.directory < ?))'); params.extend([folder, prefix, prefix + '\U0010ffff'])
+            clauses.append('(' + ' OR '.join(parts) + ')')
+        if 'error' in t:
+            clauses.append(f"r.id IN (SELECT result_id FROM result_errors WHERE error_class IN ({','.join('?' * len(t['error']))}))"); params.extend(t['error'])
+        if 'since' in t: clauses.append('r.checked_at >= ?'); params.append(max(t['since']))
+        if 'before' in t: clauses.append('r.checked_at < ?'); params.append(min(t['before']))
+        for word in self.words: clauses.append("instr(lower(r.path), ?) > 0"); params.append(word)
+        return ' AND '.join(clauses), params
+
+class ResultStore:
+    """Persistent SQLite index of check results across sessions."""
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS results (
+            id INTEGER PRIMARY KEY, session_id TEXT, path TEXT NOT NULL, directory TEXT NOT NULL, extension TEXT,
+            size INTEGER, duration REAL, codec TEXT, status TEXT NOT NULL, error_count INTEGER, first_error_time REAL,
+            check_mode TEXT, elapsed_seconds REAL, checked_at REAL NOT NULL, latest INTEGER NOT NULL DEFAULT 1, details TEXT);
+        CREATE TABLE IF NOT EXISTS result_errors (
+            result_id INTEGER NOT NULL REFERENCES results(id) ON DELETE CASCADE, error_class TEXT NOT NULL);
+        CREATE INDEX IF NOT EXISTS idx_results_path ON results(path, latest);
+        CREATE INDEX IF NOT EXISTS idx_results_status ON results(latest, status, checked_at);
+        CREATE INDEX IF NOT EXISTS idx_results_directory ON results(directory);
+        CREATE INDEX IF NOT EXISTS idx_results_codec ON results(codec);
+        CREATE INDEX IF NOT EXISTS idx_results_checked_at ON results(checked_at);
+        CREATE INDEX IF NOT EXISTS idx_result_errors_class ON result_errors(error_class, result_id);
+        CREATE TABLE IF NOT EXISTS fingerprints (
+            path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, duration REAL,
+            chunk_size INTEGER NOT NULL, hashes BLOB NOT NULL, verified_at REAL NOT NULL);
+    """
+    COMMIT_EVERY = 200
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(app_data_dir(), 'results.sqlite')
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute('PRAGMA journal_mode=WAL'); self.conn.execute('PRAGMA synchronous=NORMAL'); self.conn.execute('PRAGMA foreign_keys=ON')
+        self.conn.executescript(self.SCHEMA)
+        self.pending = 0
+
+    def record(self, result, details="", session_id=None):
+        path = os.path.normpath(result.path)
+        self.conn.execute('UPDATE results SET latest = 0 WHERE path = ? AND latest = 1', (path,))
+        cursor = self.conn.execute(
+            'INSERT INTO results (session_id, path, directory, extension, size, duration, codec, status, error_count, first_error_time, '
+            'check_mode, elapsed_seconds, checked_at, details) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (session_id, path, os.path.dirname(path), os.path.splitext(path)[1].lower(), result.size, result.duration,
+             (result.codec or None) and result.codec.lower(), result.status, result.error_count, result.first_error_time,
+             result.check_mode, result.elapsed_seconds, result.checked_at, details))
+        self.conn.executemany('INSERT INTO result_errors (result_id, error_class) VALUES (?, ?)',
+                              [(cursor.lastrowid, error_class) for error_class in result.error_classes])
+        self.pending += 1
+        if self.pending >= self.COMMIT_EVERY: self.commit()
+        return cursor.lastrowid
+
+    def commit(self):
+        if self.pending: self.conn.commit(); self.pending = 0
+
+    def fingerprint(self, path):
+        """Returns the FileFingerprint recorded when the file was last verified, or None."""
+        row = self.conn.execute('SELECT f.size, f.mtime_ns, f.duration, f.chunk_size, f.hashes, '
+                                '(SELECT codec FROM results r WHERE r.path = f.path AND r.latest = 1) FROM fingerprints f WHERE f.path = ?',
+                                (os.path.normpath(path),)).fetchone()
+        if not row: return None
+        size, mtime_ns, duration, chunk_size, blob, codec = row
+        return FileFingerprint(size, mtime_ns, [blob[i:i + 16] for i in range(0, len(blob), 16)], duration, chunk_size, codec)
+
+    def save_fingerprint(self, path, fingerprint):
+        self.conn.execute('INSERT OR REPLACE INTO fingerprints (path, size, mtime_ns, duration, chunk_size, hashes, verified_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                          (os.path.normpath(path), fingerprint.size, fingerprint.mtime_ns, fingerprint.duration, fingerprint.chunk_size,
+                           b''.join(fingerprint.hashes), time.time()))
+        self.pending += 1
+
+    def query(self, query, limit=None):
+        """Yields (CheckResult, result id) for the latest result of every file matching a ResultQuery."""
+        where, params = query.to_sql()
+        sql = ('SELECT r.id, r.path, r.status, r.size, r.duration, r.codec, r.error_count, r.first_error_time, r.check_mode, '
+               'r.elapsed_seconds, r.checked_at, (SELECT group_concat(error_class) FROM result_errors e WHERE e.result_id = r.id) '
+               f'FROM results r WHERE {where} ORDER BY r.path')
+        if limit: sql += f' LIMIT {int(limit)}'
+        for row in self.conn.execute(sql, params):
+            result = CheckResult(row[1], row[2], row[3], row[4], row[5], row[6], sorted((row[11] or '').split(',')) if row[11] else [],
+                                 row[7], row[8], row[9], row[10])
+            yield result, row[0]
+
+    def details(self, result_id):
+        row = self.conn.execute('SELECT details FROM results WHERE id = ?', (result_id,)).fetchone()
+        return row[0] if row else None
+
+    def close(self): self.commit(); self.conn.close()
+
+# --- Benchmark Suite ---
+BENCHMARK_CODECS = {
+    # name: (container extension, video encoder args, audio encoder args)
+    'h264': ('.mp4', ['-c:v', 'libx264', '-preset', 'veryfast', '-g', '50'], ['-c:a', 'aac']),
+    'hevc': ('.mkv', ['-c:v', 'libx265', '-preset', 'veryfast', '-g', '50', '-x265-params', 'log-level=error'], ['-c:a', 'aac']),
+    'mpeg2': ('.ts', ['-c:v', 'mpeg2video', '-q:v', '4', '-g', '25'], ['-c:a', 'mp2']),
+    'mpeg4': ('.avi', ['-c:v', 'mpeg4', '-q:v', '4', '-g', '50'], ['-c:a', 'pcm_s16le']),
+}
+BENCHMARK_DECODERS = {'mpeg2': 'mpeg2video'}
+
+def _children_rusage():
+    if resource is None: return None
+    return resource.getrusage(resource.RUSAGE_CHILDREN)
+
+def generate_benchmark_media(work_dir, codecs, resolutions, durations, corrupt=True, seed=1):
+    """Creates synthetic test media with ffmpeg's testsrc/sine sources.
+
+    Returns a list of dicts describing each file (path, codec, resolution, duration, corrupt).
+    Encoders missing from the installed ffmpeg build are skipped.
+    """
+    os.makedirs(work_dir, exist_ok=True)
+    rng = random.Random(seed); media = []
+    unavailable = set()
+    for codec in codecs:
+        ext, video_args, audio_args = BENCHMARK_CODECS[codec]
+        for resolution in resolutions:
+            for duration in durations:
+                if codec in unavailable: break
+                path = os.path.join(work_dir, f"{codec}_{resolution}_{duration}s{ext}")
+                if not os.path.exists(path):
+                    command = [FFMPEG.ffmpeg, '-y', '-v', 'error',
+                               '-f', 'lavfi', '-i', f'testsrc=size={resolution}:rate=25:duration={duration}',
+                               '-f', 'lavfi', '-i', f'sine=frequency=1000:duration={duration}',
+                               *video_args, '-pix_fmt', 'yuv420p', *audio_args, '-shortest', path]
+                    process = subprocess.run(command, capture_output=True, text=True, creationflags=NO_WINDOW_FLAGS)
+                    if process.returncode != 0:
+                        print(f"Skipping {codec} {resolution}: {process.stderr.strip().splitlines()[-1:] or 'encoder failed'}", file=sys.stderr)
+                        if os.path.exists(path): os.remove(path)
+                        unavailable.add(codec); break
+                entry = {'path': path, 'codec': codec, 'resolution': resolution, 'duration': duration, 'corrupt': False}
+                media.append(entry)
+                if corrupt:
+                    corrupt_path = os.path.join(work_dir, f"{codec}_{resolution}_{duration}s_corrupt{ext}")
+                    if not os.path.exists(corrupt_path): inject_corruption(path, corrupt_path, rng)
+                    media.append(dict(entry, path=corrupt_path, corrupt=True))
+    return media
+
+def inject_corruption(source, dest, rng, hits=8, hit_size=4096):
+    """Copies a file and overwrites random blocks in its middle section with garbage."""
+    shutil.copyfile(source, dest)
+    size = os.path.getsize(dest)
+    with open(dest, 'r+b') as f:
+        for _ in range(hits):
+            f.seek(rng.randint(int(size * 0.3), max(int(size * 0.3), int(size * 0.7) - hit_size)))
+            f.write(rng.randbytes(min(hit_size, size)))
+
+def run_benchmark(media, modes, concurrency_levels, fast_duration=10):
+    """Runs the checker over the media for every mode/concurrency pair and returns one result row each."""
+    total_bytes = sum(os.path.getsize(m['path']) for m in media)
+    rows = []
+    for mode in modes:
+        base_mode, _, profile = mode.partition(':')
+        options = CheckOptions(fast_check=(base_mode == 'tail'), fast_duration=fast_duration, profile=profile or 'full')
+        decoded_seconds = sum(min(m['duration'], fast_duration) if options.fast_check else m['duration'] for m in media)
+        for concurrency in concurrency_levels:
+            usage_before = _children_rusage(); start = time.perf_counter()
+            # Peak RSS comes from each check's own wait4; RUSAGE_CHILDREN would also count the encoders run earlier.
+            timings = [JobTiming() for _ in media]
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                results = list(executor.map(lambda m, timing: run_check(m['path'], options, timing, codec=BENCHMARK_DECODERS.get(m['codec'], m['codec']))[0], media, timings))
+            wall = time.perf_counter() - start; usage_after = _children_rusage()
+            peak_rss_kb = max((t.max_rss_kb for t in timings if t.max_rss_kb), default=None)
+            correct = sum(1 for m, ok in zip(media, results) if ok != m['corrupt'])
+            detected = sum(1 for m, ok in zip(media, results) if m['corrupt'] and not ok)
+            corrupt_count = sum(1 for m in media if m['corrupt'])
+            cpu_percent = None
+            if usage_before is not None and wall > 0:
+                cpu_seconds = (usage_after.ru_utime - usage_before.ru_utime) + (usage_after.ru_stime - usage_before.ru_stime)
+                cpu_percent = round(100 * cpu_seconds / wall, 1)
+            rows.append({
+                'mode': mode, 'concurrency': concurrency, 'files': len(media), 'wall_seconds': round(wall, 3),
+                'files_per_second': round(len(media) / wall, 3) if wall else None,
+                'mb_per_second': round(total_bytes / (1024 * 1024) / wall, 3) if wall else None,
+                'realtime_factor': round(decoded_seconds / wall, 2) if wall else None,
+                'cpu_percent': cpu_percent, 'peak_rss_mb': round(peak_rss_kb / 1024, 1) if peak_rss_kb else None,
+                'accuracy': round(correct / len(media), 4) if media else None,
+                'detection_rate': round(detected / corrupt_count, 4) if corrupt_count else None,
+            })
+            print(f"{mode:>14} x{concurrency:<3} {rows[-1]['files_per_second']} files/s  {rows[-1]['mb_per_second']} MB/s  "
+                  f"accuracy {rows[-1]['accuracy']}", file=sys.stderr)
+    return rows
+
+def benchmark_command(args):
+    set_ffmpeg_info(resolve_ffmpeg(args.ffmpeg))
+    if not FFMPEG.available: print(FFMPEG.error, file=sys.stderr); return 1
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix='avic_benchmark_')
+    created_work_dir = not args.work_dir or not os.path.isdir(work_dir)
+    media = generate_benchmark_media(work_dir, args.codecs.split(','), args.resolutions.split(','),
+                                     [int(d) for d in args.durations.split(',')], corrupt=not args.no_corruption)
+    if not media:
+        if created_work_dir: shutil.rmtree(work_dir, ignore_errors=True)
+        print("No benchmark media could be generated. Is ffmpeg installed?", file=sys.stderr); return 1
+    rows = run_benchmark(media, args.modes.split(','), [int(c) for c in args.concurrency.split(',')], args.fast_duration)
+    report = {'ffmpeg': FFMPEG.version, 'platform': platform.platform(), 'cpu_count': os.cpu_count(),
+              'media': media, 'results': rows}
+    if args.csv:
+        with open(args.csv, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys())); writer.writeheader(); writer.writerows(rows)
+    output = json.dumps(report, indent=2)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f: f.write(output)
+    else: print(output)
+    if args.keep: print(f"Benchmark media kept in {work_dir}", file=sys.stderr)
+    elif created_work_dir: shutil.rmtree(work_dir, ignore_errors=True)
+    else:
+        # Only remove what this run generated; the folder may hold the user's own files.
+        for entry in media:
+            try: os.remove(entry['path'])
+            except OSError: pass
+    return 0
+
+def query_command(args):
+    store = ResultStore(args.db)
+    try:
+        try: results = store.query(ResultQuery(' '.join(args.filter)), args.limit)
+        except ValueError as e: print(f"Invalid query: {e}", file=sys.stderr); return 2
+        if args.count: print(sum(1 for _ in results)); return 0
+        if args.format == 'csv':
+            writer = csv.DictWriter(sys.stdout, fieldnames=CheckResult.FIELDS); writer.writeheader()
+            for result, _ in results: writer.writerow(dict(result.to_row(), error_classes='|'.join(result.error_classes)))
+        elif args.format == 'jsonl':
+            for result, _ in results: print(json.dumps(result.to_row()))
+        else:
+            for result, _ in results:
+                checked = datetime.fromtimestamp(result.checked_at).strftime('%Y-%m-%d %H:%M')
+                print(f"{result.status:<7} {checked}  {(result.codec or '-'):<8} {','.join(result.error_classes) or '-':<20} {result.path}")
+    finally: store.close()
+    return 0
+
+def checksums_command(args):
+    set_ffmpeg_info(resolve_ffmpeg(args.ffmpeg))
+    if not FFMPEG.available: print(FFMPEG.error, file=sys.stderr); return 1
+    options = CheckOptions(analyze=args.analyze, checksums=args.action); failures = 0
+    for path in args.paths:
+        is_success, details = run_check(path, options)
+        failures += not is_success
+        print(f"{'OK' if is_success else 'FAILED':<7} {path}")
+        if details != "OK": print(''.join(f"        {line}\n" for line in details.splitlines()[:20]), end='')
+    return 1 if failures else 0
+
+# --- Command Line ---
+def build_arg_parser():
+    parser = argparse.ArgumentParser(prog="video_checker.py", description="Advanced Video Integrity Checker. Run without arguments to open the GUI.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    bench = commands.add_parser('benchmark', help="Measure check throughput across modes and concurrency levels using synthetic media.")
+    bench.add_argument('--work-dir', help="Where synthetic media is generated (default: a new temporary folder).")
+    bench.add_argument('--codecs', default='h264,hevc,mpeg2,mpeg4', help=f"Comma-separated, from: {', '.join(BENCHMARK_CODECS)}")
+    bench.add_argument('--resolutions', default='640x360,1920x1080')
+    bench.add_argument('--durations', default='10,60', help="Comma-separated clip lengths in seconds.")
+    bench.add_argument('--modes', default='full,tail', help="Comma-separated check modes: full, tail, optionally with a profile, e.g. full:keyframes.")
+    bench.add_argument('--concurrency', default=','.join(str(c) for c in sorted({1, 2, max(1, (os.cpu_count() or 1) // 2), os.cpu_count() or 1})))
+    bench.add_argument('--fast-duration', type=int, default=10, help="Seconds checked from the end in tail mode.")
+    bench.add_argument('--no-corruption', action='store_true', help="Do not generate corrupted copies.")
+    bench.add_argument('--json', help="Write the JSON report here instead of stdout.")
+    bench.add_argument('--csv', help="Also write the result matrix as CSV.")
+    bench.add_argument('--keep', action='store_true', help="Keep the generated media for later runs.")
+    bench.add_argument('--ffmpeg', help="Path to the ffmpeg binary or its folder (default: bundled, then PATH).")
+    bench.set_defaults(handler=benchmark_command)
+    query = commands.add_parser('query', help="Search the result index across all sessions.",
+                                description=ResultQuery.__doc__.split('\n\n')[0] + " Example: query 'codec:hevc under:/archive/2019 status:failed since:lastmonth'")
+    query.add_argument('filter', nargs='*', help="Query terms, e.g. status:failed codec:hevc under:/archive since:30d")
+    query.add_argument('--db', help="Result index to search (default: the application's index).")
+    query.add_argument('--format', choices=['table', 'csv', 'jsonl'], default='table')
+    query.add_argument('--limit', type=int)
+    query.add_argument('--count', action='store_true', help="Only print the number of matching files.")
+    query.set_defaults(handler=query_command)
+    checksums = commands.add_parser('checksums', help="Record or verify per-frame decoded checksums of files.")
+    checksums.add_argument('action', choices=['record', 'verify'])
+    checksums.add_argument('paths', nargs='+', help="Media files to process.")
+    checksums.add_argument('--analyze', action='store_true', help="Also report timestamp and A/V sync problems.")
+    checksums.add_argument('--ffmpeg', help="Path to the ffmpeg binary or its folder (default: bundled, then PATH).")
+    checksums.set_defaults(handler=checksums_command)
+    return parser
+
+CLI_COMMANDS = {'benchmark', 'query', 'checksums'}
+
 # --- Run the Application ---
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in CLI_COMMANDS | {'-h', '--help'}:
+        cli_args = build_arg_parser().parse_args()
+        sys.exit(cli_args.handler(cli_args))
+
     app = QApplication(sys.argv)
     if "Fusion" in QStyleFactory.keys(): app.setStyle("Fusion")
     